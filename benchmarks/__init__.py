@@ -0,0 +1 @@
+"""Benchmarks of classarg. Run `python -m benchmarks --help` for usage."""
@@ -0,0 +1,63 @@
+import sys
+import json
+import time
+import platform
+
+import classarg
+
+from .suite import benchmarks
+
+
+def main(*names, output: str = '', repeat: int = 5, max_size: int = 1000000):
+    """Run benchmarks of classarg and print the results in JSON.
+
+    names:     the benchmarks to run. Run all benchmarks if not given.
+    output:    also write the results into this file.
+    repeat:    the number of repeated measurements.
+    max_size:  the largest input size of scaling benchmarks.
+    -o:        --output
+    -r:        --repeat
+    """
+    names = names or tuple(benchmarks)
+    unknown = set(names) - set(benchmarks)
+    if unknown:
+        raise SystemExit('Unknown benchmarks: {}'.format(
+            ', '.join(sorted(unknown))))
+
+    results = []
+    for name in names:
+        for params, stats in benchmarks[name](repeat, max_size):
+            result = dict(name=name, params=params, **stats)
+            results.append(result)
+            print(json.dumps(result), file=sys.stderr)
+
+    report = dict(
+        classarg=classarg.__version__,
+        python=platform.python_version(),
+        implementation=platform.python_implementation(),
+        platform=platform.platform(),
+        timestamp=time.time(),
+        results=results,
+    )
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    print(json.dumps(report, indent=2))
+
+
+def cli(argv):
+    # classarg.run doesn't handle --help, see classarg.__main__.
+    if '-h' in argv or '--help' in argv:
+        from classarg.core import parse
+        from classarg._doc import get_normalized_docstring
+
+        print(get_normalized_docstring(parse(main)))
+        return
+
+    classarg.run(main, args=argv)
+
+
+if __name__ == '__main__':
+    cli(sys.argv[1:])
@@ -0,0 +1,164 @@
+import os
+import re
+import sys
+import subprocess
+from timeit import Timer
+
+import classarg.core as core
+import classarg._doc as doc
+import classarg._typing as typing_
+
+__all__ = (
+    'benchmarks',
+    'measure',
+)
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+benchmarks = {}
+
+
+def benchmark(func):
+    benchmarks[func.__name__] = func
+    return func
+
+
+def measure(stmt, setup=None, repeat=5, number=None):
+    """Time stmt and return the statistics in seconds per call.
+
+    If number is None, it's determined so that each repeat takes at least
+    0.2 seconds.
+    """
+    timer = Timer(stmt, setup=setup or (lambda: None))
+    if number is None:
+        number, _ = timer.autorange()
+
+    timings = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return dict(
+        min=min(timings),
+        mean=sum(timings) / len(timings),
+        repeat=repeat,
+        number=number,
+    )
+
+
+@benchmark
+def import_classarg(repeat, max_size):
+    """Cumulative import time of `import classarg` in a new interpreter."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    timings = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            (sys.executable, '-X', 'importtime', '-c', 'import classarg'),
+            env=env, stderr=subprocess.PIPE, universal_newlines=True,
+            check=True)
+        matched = re.search(r'\|\s*(\d+)\s*\|\s*classarg$',
+                            result.stderr, re.MULTILINE)
+        if matched is None:  # -X importtime is added in python 3.7
+            yield {}, dict(skipped='-X importtime is not supported')
+            return
+
+        timings.append(int(matched.group(1)) / 1e6)
+
+    yield {}, dict(min=min(timings), mean=sum(timings) / len(timings),
+                   repeat=repeat, number=1)
+
+
+def _make_callables():
+    def func(a, b: int = 1, *c: float, d: str, e=False, **f):
+        """Lorem ipsum dolor sit amet.
+
+        a:  Lorem ipsum dolor sit amet.
+        -x: --e
+        """
+
+    class Target:
+        def __init__(self, a, b: int = 1, *c: float, d: str, e=False, **f):
+            pass
+
+        def method(self, a, b: int = 1, *c: float, d: str, e=False, **f):
+            pass
+
+        def __call__(self, a, b: int = 1, *c: float, d: str, e=False, **f):
+            pass
+
+    return dict(function=func, method=Target(1, d='').method,
+                cls=Target, instance=Target(1, d=''))
+
+
+@benchmark
+def get_normalized_spec(repeat, max_size):
+    for kind, func in _make_callables().items():
+        yield dict(kind=kind), measure(
+            lambda: core._get_normalized_spec(func), repeat=repeat)
+
+
+@benchmark
+def parse(repeat, max_size):
+    for kind, func in _make_callables().items():
+        yield dict(kind=kind, cache=False), measure(
+            lambda: core.parse(func, cache=False), repeat=repeat)
+
+    func = _make_callables()['function']
+    yield dict(kind='function', cache=True), measure(
+        lambda: core.parse(func), repeat=repeat)
+
+
+def _make_docstring(size):
+    lines = ['Lorem ipsum dolor sit amet.', '', 'Arguments:']
+    for i in range(size):
+        lines.append('    flag{}:  Lorem ipsum dolor sit amet, consectetur'
+                     .format(i))
+        lines.append('            adipiscing elit. Mauris sed urna quis.')
+        lines.append('    -f{}:    --flag{}'.format(i, i))
+
+    return '\n'.join(lines)
+
+
+def _sizes(max_size, start=10):
+    size = start
+    while size <= max_size:
+        yield size
+        size *= 10
+
+
+@benchmark
+def load_doc_hints(repeat, max_size):
+    for size in _sizes(min(max_size, 10000)):
+        docstring = _make_docstring(size)
+
+        def stmt():
+            spec = core._get_arg_spec(lambda **kwargs: None)
+            doc.load_doc_hints(spec, docstring)
+
+        yield dict(flags=size), measure(stmt, repeat=repeat)
+
+
+@benchmark
+def normalize_type(repeat, max_size):
+    annotations = dict(
+        simple='Optional[int]',
+        nested='Optional[Union[List[int], Tuple[int, float, str]]]',
+        typing=typing_.Union[typing_.List[int], typing_.Tuple[int, float]],
+    )
+
+    for name, annotation in annotations.items():
+        yield dict(annotation=name, cache=False), measure(
+            lambda: typing_.normalize_type(annotation),
+            setup=typing_.clear_type_cache, repeat=repeat, number=1)
+        yield dict(annotation=name, cache=True), measure(
+            lambda: typing_.normalize_type(annotation), repeat=repeat)
+
+
+@benchmark
+def match_args(repeat, max_size):
+    def func(a, *b: int, c: int = 0, d=False): pass
+
+    spec = core.parse(func)
+    for size in _sizes(max_size):
+        args = ['a', '--c=1', '-d'] + [str(i) for i in range(size)]
+        number = 1 if size >= 10000 else None
+        yield dict(size=size), measure(
+            lambda: core._match_args(spec, args),
+            repeat=repeat, number=number)
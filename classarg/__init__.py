@@ -1,7 +1,7 @@
-from .core import parse, match, run
 from .utils import compatible_with
 
-__all__ = ('parse', 'run', 'match')
+__all__ = ('parse', 'run', 'match', 'match_many', 'Spec', 'Dispatcher',
+           'extract_spec')
 
 
 # The following variables will be used in PyPI index.
@@ -19,12 +19,46 @@ __email__ = 'patrickchen1994@gmail.com'
 __status__ = 'Prototype'
 
 
+# Submodules are imported on first use, so that importing classarg is cheap
+# for short-lived CLI apps.
+_lazy_attributes = {
+    'parse': 'core',
+    'match': 'core',
+    'match_many': 'core',
+    'run': 'core',
+    'Spec': '_spec',
+    'Dispatcher': 'dispatch',
+    'extract_spec': '_static',
+}
+
+
+def _load_attribute(module, name):
+    from importlib import import_module
+    value = getattr(import_module('.' + _lazy_attributes[name], __name__),
+                    name)
+    setattr(module, name, value)
+
+    return value
+
+
 # classarg(func) only available in python >= 3.5
 if compatible_with(3, 5):
     import sys
 
     class Main(sys.modules[__name__].__class__):
-        __call__ = run
+        def __getattr__(self, name):
+            if name not in _lazy_attributes:
+                raise AttributeError(
+                    "module '{}' has no attribute '{}'".format(
+                        __name__, name))
+
+            return _load_attribute(self, name)
+
+        def __dir__(self):
+            return sorted(set(super().__dir__()) | set(_lazy_attributes))
+
+        def __call__(self, *args, **kwargs):
+            return self.run(*args, **kwargs)
 
     sys.modules[__name__].__class__ = Main
 
@@ -38,9 +72,15 @@ else:
             self._module = module
 
         def __getattr__(self, name):
+            if name in _lazy_attributes:
+                return _load_attribute(self._module, name)
+
             return getattr(self._module, name)
 
+        def __dir__(self):
+            return sorted(set(dir(self._module)) | set(_lazy_attributes))
+
         def __call__(self, *args, **kwargs):
-            return run(*args, **kwargs)
+            return self.run(*args, **kwargs)
 
     sys.modules[__name__] = Main(sys.modules[__name__])
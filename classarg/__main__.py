@@ -1,30 +1,93 @@
+import sys
+
 from .utils import compatible_with
 
 
 # load_module(path)
 if compatible_with(3, 4):
-    import importlib
-
-    def load_module(path):
-        spec = importlib.util.spec_from_file_location('target_module', path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-
-        return module
+    from .utils import load_module, get_qualified_attr
 else:
     raise NotImplementedError(
         'This module only support Python version >= 3.4')
 
 
-def main(module, dry_run=False, *arguments):
+def main(module, dry_run=False, *arguments, func='main'):
     """Load module to run
 
+    Usage: python -m classarg [--dry-run] [--func=NAME] MODULE [ARGUMENTS...]
+
     module: module path
     dry_run: only parse input arguments and print them
     arguments: arguments of the imported module
+    func: the name of the entry function in the module
     """
-    module = load_module(module)
+    from .core import match, run
+
+    if dry_run:
+        # Try not to import the module, which runs its body.
+        from ._static import extract_spec
+        spec = extract_spec(module, func)
+        if spec is None:
+            spec = get_qualified_attr(load_module(module), func)
+
+        matcher_args, matcher_kwargs = match(spec, args=arguments)
+        print('args: {!r}'.format(matcher_args))
+        print('kwargs: {!r}'.format(matcher_kwargs))
+        return 0
+
+    target = get_qualified_attr(load_module(module), func)
+    ret = run(target, args=arguments)
+
+    # Like sys.exit, integers are used as the exit status.
+    if isinstance(ret, int) and not isinstance(ret, bool):
+        return ret
+    return 0
+
+
+def _get_value_options():
+    from .core import parse
+
+    spec = parse(main)
+    ret = set()
+    for name in spec.args + spec.kwonlyargs:
+        if spec.annotations.get(name) is not bool:
+            ret.update(('--' + name, '--' + name.replace('_', '-')))
+
+    return ret
+
+
+def _split_argv(argv):
+    # Options of classarg precede the module path. The rest belongs to the
+    # module and shouldn't be matched against main.
+    value_options = _get_value_options()
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if not arg.startswith('-'):
+            return argv[:i+1], argv[i+1:]
+
+        # e.g. '--func NAME', whose value isn't the module path
+        i += 2 if arg in value_options else 1
+
+    return argv, []
+
+
+def cli(argv):
+    from .core import parse, match, ArgumentError
+    from ._doc import get_normalized_docstring
+
+    options, arguments = _split_argv(argv)
+    if '-h' in options or '--help' in options:
+        print(get_normalized_docstring(parse(main)))
+        return 0
+
+    try:
+        (module, dry_run), kwargs = match(main, args=options)
+        return main(module, dry_run, *arguments, **kwargs)
+    except ArgumentError as e:
+        print('error: {}'.format(e), file=sys.stderr)
+        return 2
 
 
 if __name__ == '__main__':
-    pass
+    sys.exit(cli(sys.argv[1:]))
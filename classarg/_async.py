@@ -0,0 +1,62 @@
+"""Run async entry points and validation rules.
+
+This module is loaded on demand, so that core keeps working without
+asyncio. Rules and entry points may be sync or async; the results of
+async ones are awaited.
+"""
+import asyncio
+from inspect import isawaitable
+
+from . import core
+from .utils import compatible_with
+
+__all__ = (
+    'run_async',
+    'validate_async',
+)
+
+
+async def validate_async(func, matcher, *, spec=None, **options):
+    rules = getattr(func, '_classarg_val', None)
+    if not rules:
+        return
+
+    validator = core._get_validator(func, rules, spec, options)
+    for check in validator.checks:
+        result = check(matcher)
+        if isawaitable(result):
+            await result
+
+
+async def run_async(func, *, args=None, **options):
+    matcher = core.compile_matcher(func, **options)
+    matcher_args, matcher_kwargs = core.match(matcher, args=args, **options)
+    await validate_async(func, core._get_matcher_dict(
+        matcher.spec, matcher_args, matcher_kwargs),
+        spec=matcher.spec, **options)
+
+    ret = func(*matcher_args, **matcher_kwargs)
+    if isawaitable(ret):
+        ret = await ret
+
+    return ret
+
+
+if compatible_with(3, 7):
+    def run_on_loop(coro):
+        """Run coro to completion, or return it if a loop is running."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+
+        return coro
+
+else:
+    def run_on_loop(coro):
+        """Run coro to completion, or return it if a loop is running."""
+        loop = asyncio.get_event_loop()
+        if loop.is_running():
+            return coro
+
+        return loop.run_until_complete(coro)
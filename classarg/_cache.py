@@ -0,0 +1,141 @@
+import os
+import sys
+from collections import OrderedDict, namedtuple
+
+__all__ = (
+    'CacheInfo',
+    'LRUCache',
+    'get_cache_path',
+    'get_source_stamp',
+    'get_spec_path',
+    'load_spec',
+    'dump_spec',
+)
+
+
+# Bump this whenever the layout of a spec changes.
+_spec_format = 3
+
+
+CacheInfo = namedtuple('CacheInfo', 'hits misses maxsize currsize')
+
+
+class LRUCache:
+    """A bounded mapping that evicts the least recently used entry.
+
+    maxsize: the maximum number of entries kept. None means unbounded.
+
+    Lookups through get() are counted, see info().
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+
+        if self.maxsize is not None:
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def pop(self, key, default=None):
+        return self._data.pop(key, default)
+
+    def clear(self):
+        self.hits = self.misses = 0
+        self._data.clear()
+
+
+def get_cache_path(source, name, suffix):
+    """Get the path of the data of `name` defined in `source`.
+
+    Like .pyc files, the data is stored in the __pycache__ directory next to
+    the source file.
+    """
+    dirname, basename = os.path.split(source)
+    basename = os.path.splitext(basename)[0]
+    filename = '{}.{}.{}.{}'.format(
+        basename, name, sys.implementation.cache_tag, suffix)
+
+    return os.path.join(dirname, '__pycache__', filename)
+
+
+def get_spec_path(source, name):
+    """Get the path of the persisted spec of `name` defined in `source`."""
+    return get_cache_path(source, name, 'spec')
+
+
+def get_source_stamp(source, version=_spec_format):
+    """Get the stamp which data derived from source is invalidated by."""
+    st = os.stat(source)
+    return (version, st.st_mtime_ns, st.st_size)
+
+
+def _get_stamps(sources):
+    if isinstance(sources, str):
+        sources = (sources, )
+
+    return tuple(get_source_stamp(source) for source in sources)
+
+
+def load_spec(sources, path):
+    """Load a persisted spec. Return None if it's missing or stale.
+
+    sources: the source file, or the files, the spec is derived from. The
+             spec is stale if any of them changes.
+    """
+    import pickle  # load module on demand
+
+    try:
+        stamp = _get_stamps(sources)
+        with open(path, 'rb') as f:
+            saved_stamp, spec = pickle.load(f)
+    except (OSError, EOFError, ValueError, TypeError,
+            AttributeError, ImportError, pickle.UnpicklingError):
+        return None
+
+    if saved_stamp != stamp:
+        return None
+
+    return spec
+
+
+def dump_spec(sources, path, spec):
+    """Persist a spec. Failures are ignored since it's only a cache."""
+    import pickle  # load module on demand
+
+    tmp_path = '{}.{}'.format(path, os.getpid())
+    try:
+        data = pickle.dumps((_get_stamps(sources), spec))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, AttributeError, pickle.PicklingError):
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
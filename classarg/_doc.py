@@ -1,24 +1,38 @@
 import re
 from textwrap import dedent, TextWrapper
+from functools import lru_cache
 from collections import defaultdict
 
+from ._cache import LRUCache
+
 
 def _is_valid_alias_source(spec, key):
     return key != spec.varkw
 
 
-def _is_valid_arg(spec, key):
-    return (key in spec.args or
-            key == spec.varargs or
-            key == spec.varkw or
-            key in spec.kwonlyargs)
+def _get_valid_args(spec):
+    valid_args = set(spec.args)
+    valid_args.update(spec.kwonlyargs)
+    valid_args.update(key for key in (spec.varargs, spec.varkw)
+                      if key is not None)
+
+    return valid_args
 
 
 arg_doc_pattern = re.compile(r'^-{,2}([^\d\W]\w*):\s{1,}(.+)')
 alias_pattern = re.compile(r'^-{,2}([^\d\W]\w*):\s{1,}(-{1,2}[^\d\W]\w*)$')
 
 
-def _normalize_argument_docs(spec, section):
+def _join_doc_lines(lines):
+    # Blank continuation lines are dropped, unless it's the last one.
+    text = '\n'.join(line for line in lines if line)
+    if len(lines) > 1 and not lines[-1]:
+        text += '\n'
+
+    return text
+
+
+def _normalize_argument_docs(spec, section, valid_args=None):
     """Parse arg docs into entries and aliases
 
     An arg entry has key in spec.{args, kwonlydefaults, varargs, varkw}
@@ -38,47 +52,60 @@ def _normalize_argument_docs(spec, section):
     If kwargs exists, there can be aliases in the format of arg entry. These
     aliases will be added into available switches. If there's no kwargs, this
     type of alias is not allowed.
+
+    The section is scanned once. Lines of each entry are collected and joined
+    at the end, so the cost is linear in the length of the section.
+    valid_args is the set of names in the spec, which is updated with the
+    flags added for kwargs.
     """
-    waiting = section.split('\n')
-    docs, aliases = {}, {}
-    last_key = None
+    if valid_args is None:
+        valid_args = _get_valid_args(spec)
 
-    while waiting:
-        line = waiting.pop(0).rstrip()
-        matched = arg_doc_pattern.search(line) or alias_pattern.search(line)
+    doc_lines, aliases = {}, {}
+    new_kwonlyargs = []
+    last_lines = None
+
+    for line in section.split('\n'):
+        line = line.rstrip()
+        matched = arg_doc_pattern.match(line)
         if matched is None:
-            if last_key in docs:
-                line = ' ' + line.strip()
-                docs[last_key] = '{}\n{}'.format(
-                    docs[last_key].rstrip(), line.lstrip())
-        else:
-            key, value = matched.groups()
-            if value.startswith('-'):
-                # for alias,
-                # argument_docs values don't start with '-'
-                key, value = key.lstrip('-'), value.lstrip('-')
-                if _is_valid_arg(spec, key):
-                    raise ValueError(
-                        "Key '{}' for aliasing has bee used.".format(key))
-
-                if _is_valid_alias_source(spec, value):
-                    aliases[key] = value
-                    last_key = key
-                else:
-                    last_key = None
-            else:
-                if _is_valid_arg(spec, key):
-                    docs[key] = value
-                    last_key = key
-                elif spec.varkw is not None:
-                    spec.kwonlyargs.append(key)
-                    spec.kwonlydefaults[key] = False
-                    spec.annotations[key] = bool
-                    docs[key] = value
-                    last_key = key
-                else:
-                    last_key = None
+            if last_lines is not None:
+                last_lines.append(line.strip())
+            continue
+
+        key, value = matched.groups()
+        last_lines = None
+
+        if value.startswith('-'):
+            # for alias,
+            # argument_docs values don't start with '-'
+            key = key.lstrip('-')
+            if key in valid_args:
+                raise ValueError(
+                    "Key '{}' for aliasing has bee used.".format(key))
+
+            if alias_pattern.match(line) is None:
+                continue
+
+            value = value.lstrip('-')
+            if _is_valid_alias_source(spec, value):
+                aliases[key] = value
+
+        elif key in valid_args:
+            last_lines = doc_lines[key] = [value]
+
+        elif spec.varkw is not None:
+            new_kwonlyargs.append(key)
+            valid_args.add(key)
+            spec.kwonlydefaults[key] = False
+            spec.annotations[key] = bool
+            last_lines = doc_lines[key] = [value]
 
+    if new_kwonlyargs:
+        # kwonlyargs is an empty tuple if there's none
+        spec.kwonlyargs = list(spec.kwonlyargs) + new_kwonlyargs
+
+    docs = {key: _join_doc_lines(lines) for key, lines in doc_lines.items()}
     return docs, aliases
 
 
@@ -96,45 +123,49 @@ def load_doc_hints(spec, docstring): # noqa
     spec.descriptions = []
     spec.argument_docs = {}
     spec.aliases = {}
+    spec.alias_groups = {}
 
-    sections = [dedent(sec).strip()
-                for sec in docstring.split('\n\n')]
-
-    for section in sections:
+    valid_args = _get_valid_args(spec)
+    for section in docstring.split('\n\n'):
+        section = dedent(section).strip()
         if not section:
             continue
 
         original_section = section
         header, *contents = section.split('\n', maxsplit=1)
-        if any(header.lower().endswith(item)
-               for item in candidate_headers_ending) and contents:
+        if header.lower().endswith(candidate_headers_ending) and contents:
             section = dedent(contents[0])
-            print(section)
 
-        argument_docs, aliases = _normalize_argument_docs(spec, section)
+        argument_docs, aliases = _normalize_argument_docs(
+            spec, section, valid_args)
 
         if not argument_docs and not aliases:
             spec.descriptions.append(original_section)
         else:
-            spec.argument_docs.update(**argument_docs)
-            spec.aliases.update(**aliases)
+            spec.argument_docs.update(argument_docs)
+            spec.aliases.update(aliases)
+
+    # Precompute the aliases of each argument for rendering help.
+    spec.alias_groups = _group_aliases(spec.aliases)
 
     return spec
 
 
+@lru_cache(maxsize=64)
+def _get_wrapper(width, tabstop, indent):
+    return TextWrapper(
+        initial_indent=' '*indent,
+        width=width-tabstop, subsequent_indent=' '*tabstop)
+
+
 def _get_one_argument_doc(key, doc, width, tabstop):
     key = '  ' + key + '  '
 
     if len(key) > tabstop:
-        wrapper = TextWrapper(
-            initial_indent=' '*tabstop,
-            width=width-tabstop, subsequent_indent=' '*tabstop)
+        wrapper = _get_wrapper(width, tabstop, tabstop)
         return key.rstrip() + '\n' + '\n'.join(wrapper.wrap(doc))
     else:
-        wrapper = TextWrapper(
-            initial_indent=' '*(tabstop-len(key)),
-            width=width-tabstop, subsequent_indent=' '*tabstop)
-
+        wrapper = _get_wrapper(width, tabstop, tabstop-len(key))
         return key + '\n'.join(wrapper.wrap(doc))
 
 
@@ -142,36 +173,57 @@ def _prefix_key(key):
     return '-' + key if len(key) == 1 else '--' + key
 
 
+def _group_aliases(aliases):
+    """Map each alias source to its prefixed aliases, longest first."""
+    groups = defaultdict(list)
+    for alias, source in aliases.items():
+        groups[source].append(_prefix_key(alias))
+
+    for group in groups.values():
+        group.sort(key=len, reverse=True)
+
+    return dict(groups)
+
+
+# Rendered docstrings are cached by the identity of the spec, which is
+# treated as read-only once parsed. Entries keep the spec alive to pin its id.
+_docstring_cache = LRUCache(maxsize=128)
+
+
 def get_normalized_docstring(spec, width=70, tabstop=16):
+    key = (id(spec), width, tabstop)
+    entry = _docstring_cache.get(key)
+    if entry is None or entry[0] is not spec:
+        entry = (spec, _render_docstring(spec, width, tabstop))
+        _docstring_cache[key] = entry
+
+    return entry[1]
+
+
+def _render_docstring(spec, width, tabstop):
     sections = []
     if hasattr(spec, 'descriptions'):
         sections.append('\n\n'.join(text for text in spec.descriptions))
 
     if hasattr(spec, 'argument_docs') and hasattr(spec, 'aliases'):
         items = ['Arguments:']
-        aliases = defaultdict(list)
-        for alias, source in spec.aliases.items():
-            aliases[source].append(_prefix_key(alias))
+        alias_groups = getattr(spec, 'alias_groups', None)
+        if alias_groups is None:
+            alias_groups = _group_aliases(spec.aliases)
 
-        candidates = []
-        candidates.extend(spec.args)
+        candidates = [(key, key) for key in spec.args]
         if spec.varargs:
-            candidates.append(spec.varargs)
-        candidates.extend(spec.kwonlyargs)
+            candidates.append((spec.varargs, spec.varargs))
+        candidates.extend((key, _prefix_key(key)) for key in spec.kwonlyargs)
 
-        for key in candidates:
-            if key not in spec.argument_docs:
+        for name, key in candidates:
+            if name not in spec.argument_docs:
                 continue
-            doc = spec.argument_docs[key]
-
-            name = key
-            if name in spec.kwonlyargs:
-                key = _prefix_key(key)
+            doc = spec.argument_docs[name]
 
-            if name in aliases:
-                aliases[key].sort(key=len, reverse=True)
+            if name in alias_groups:
                 key = '{}, {}'.format(
-                    key, ', '.join(aliases[name]))
+                    key, ', '.join(alias_groups[name]))
 
             items.append(_get_one_argument_doc(key, doc, width, tabstop))
 
@@ -0,0 +1,251 @@
+"""Per-phase profiling of parse, match, validate and run.
+
+While a Profile is active, the functions of each phase are replaced by
+instrumented ones, which record the elapsed nanoseconds and the number of
+memory blocks allocated by the interpreter (sys.getallocatedblocks) during
+the call. The original functions are restored when the profile exits, so
+there is no overhead otherwise. For instance,
+
+    with classarg.core.profile() as prof:
+        classarg.run(main)
+
+    print(prof.summary())
+    prof.dump('trace.json', format='chrome')
+
+Setting the environment variable CLASSARG_PROFILE=PATH profiles each call
+of classarg.run and dumps it to PATH. CLASSARG_PROFILE_FORMAT selects the
+format, 'json' (default) or 'chrome', which can be opened in
+chrome://tracing or Perfetto.
+
+Phases can nest, e.g. getfullargspec and load_doc_hints are part of parse.
+Each validation rule is recorded as a phase named 'rule:NAME'.
+"""
+import os
+import sys
+import json
+import threading
+from functools import wraps
+from collections import namedtuple
+from time import perf_counter
+
+from .utils import compatible_with
+
+__all__ = (
+    'PhaseRecord',
+    'Profile',
+)
+
+
+if compatible_with(3, 7):
+    from time import perf_counter_ns as _clock
+else:
+    def _clock():
+        return int(perf_counter() * 1e9)
+
+
+PhaseRecord = namedtuple(
+    'PhaseRecord',
+    'name thread_id depth start_ns duration_ns allocated_blocks')
+
+
+# (module, attribute, phase) of the instrumented functions.
+_phases = (
+    ('core', '_get_arg_spec', 'getfullargspec'),
+    ('_typing', 'load_type_hints', 'load_type_hints'),
+    ('_doc', 'load_doc_hints', 'load_doc_hints'),
+    ('core', '_load_or_parse', 'parse'),
+    ('core', 'compile_matcher', 'compile_matcher'),
+    ('core', 'match', 'match'),
+    ('core', '_run', 'run'),
+)
+
+_lock = threading.Lock()
+_active = None
+
+
+def _get_rule_name(rule):
+    rule = getattr(rule, 'func', rule)
+    return getattr(rule, '__name__', None) or repr(rule)
+
+
+class Profile:
+    """Record the phases of classarg calls while active.
+
+    records: the list of PhaseRecord in the order of completion. Times are
+             in nanoseconds since the profile started.
+
+    Only one profile can be active at a time. Calls in all threads are
+    recorded.
+    """
+    def __init__(self):
+        self.records = []
+        self._start = None
+        self._local = threading.local()
+        self._patched = []
+        self._validators = {}
+
+    def _instrument(self, name, func):
+        records, local = self.records, self._local
+        get_blocks = sys.getallocatedblocks
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            depth = getattr(local, 'depth', 0)
+            local.depth = depth + 1
+            blocks = get_blocks()
+            start = _clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                end = _clock()
+                local.depth = depth
+                records.append(PhaseRecord(
+                    name, threading.get_ident(), depth,
+                    start - self._start, end - start,
+                    get_blocks() - blocks))
+
+        return wrapper
+
+    def _patch(self, owner, name, value):
+        self._patched.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, value)
+
+    def _get_validator(self, compile_validator, parse):
+        # Validators cached with specs were compiled without instrumented
+        # rules, so they're compiled again for this profile.
+        validators = self._validators
+
+        def compile_instrumented(rules, spec):
+            validator = compile_validator(rules, spec)
+            wrapper = self._instrument('validate', validator)
+            wrapper.batch = self._instrument('validate', validator.batch)
+            return wrapper
+
+        def get_validator(func, rules, spec, options):
+            key = (id(func), tuple(rules))
+            if key not in validators:
+                spec = spec or parse(
+                    func,
+                    skip_type_hints=options.get('skip_type_hints', False))
+                # func is kept to prevent reusing its id
+                validators[key] = func, compile_instrumented(rules, spec)
+
+            return validators[key][1]
+
+        return get_validator
+
+    def __enter__(self):
+        global _active
+
+        with _lock:
+            if _active is not None:
+                raise RuntimeError('Another profile is active')
+            _active = self
+
+        self._start = _clock()
+        try:
+            self._instrument_all()
+        except BaseException:
+            self.__exit__(*sys.exc_info())
+            raise
+
+        return self
+
+    def _instrument_all(self):
+        from importlib import import_module
+        from . import core
+
+        for module_name, name, phase in _phases:
+            module = import_module('.' + module_name, __package__)
+            self._patch(module, name,
+                        self._instrument(phase, getattr(module, name)))
+
+        self._patch(core.Matcher, 'match',
+                    self._instrument('match_args', core.Matcher.match))
+
+        compile_rule = core._compile_rule
+        compile_batch_rule = core._compile_batch_rule
+        self._patch(core, '_compile_rule', lambda rule, spec: (
+            self._instrument('rule:' + _get_rule_name(rule),
+                             compile_rule(rule, spec))))
+        self._patch(core, '_compile_batch_rule', lambda rule, spec, check: (
+            self._instrument('rule:' + _get_rule_name(rule),
+                             compile_batch_rule(rule, spec, check))))
+        self._patch(core, '_get_validator', self._get_validator(
+            core._compile_validator, core.parse))
+
+    def __exit__(self, *exc_info):
+        global _active
+
+        while self._patched:
+            owner, name, value = self._patched.pop()
+            setattr(owner, name, value)
+
+        self._validators.clear()
+        with _lock:
+            _active = None
+
+    def summary(self):
+        """Get dict from phases to their count, total time and allocations.
+
+        Time spent in nested phases is also counted in the outer ones.
+        """
+        ret = {}
+        for record in self.records:
+            stats = ret.setdefault(record.name, dict(
+                count=0, total_ns=0, allocated_blocks=0))
+            stats['count'] += 1
+            stats['total_ns'] += record.duration_ns
+            stats['allocated_blocks'] += record.allocated_blocks
+
+        return ret
+
+    def to_dict(self):
+        """Get the records and the summary as a JSON-serializable dict."""
+        records = sorted(self.records, key=lambda r: r.start_ns)
+        return dict(records=[dict(record._asdict()) for record in records],
+                    summary=self.summary())
+
+    def to_chrome_trace(self):
+        """Get the records in the Chrome trace event format."""
+        pid = os.getpid()
+        events = [dict(name=record.name, cat='classarg', ph='X',
+                       ts=record.start_ns / 1000,
+                       dur=record.duration_ns / 1000,
+                       pid=pid, tid=record.thread_id,
+                       args=dict(allocated_blocks=record.allocated_blocks))
+                  for record in sorted(self.records,
+                                       key=lambda r: r.start_ns)]
+
+        return dict(traceEvents=events, displayTimeUnit='ns')
+
+    def dump(self, path, format='json'):
+        """Write the profile to path.
+
+        format: one of 'json', see to_dict, and 'chrome', see
+                to_chrome_trace.
+        """
+        if format == 'json':
+            data = self.to_dict()
+        elif format == 'chrome':
+            data = self.to_chrome_trace()
+        else:
+            raise ValueError("format should be one of 'json', 'chrome'")
+
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+def run_profiled(path, func, args, options):
+    """Run func with a profile dumped to path, unless one is active."""
+    from . import core
+
+    if _active is not None:
+        return core._run(func, args, options)
+
+    profile = Profile()
+    try:
+        with profile:
+            return core._run(func, args, options)
+    finally:
+        profile.dump(path, os.environ.get('CLASSARG_PROFILE_FORMAT', 'json'))
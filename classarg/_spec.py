@@ -0,0 +1,176 @@
+"""The immutable spec of a callable.
+
+Specs are built by classarg.parse, and shared by the matchers, validators
+and docstrings of a callable, so they can't be changed once built. Use
+Spec.replace to derive a new one.
+"""
+import sys
+from types import SimpleNamespace
+
+__all__ = (
+    'Spec',
+)
+
+
+# The same fields as inspect.getfullargspec.
+_fields = (
+    'args',
+    'varargs',
+    'varkw',
+    'defaults',
+    'kwonlyargs',
+    'kwonlydefaults',
+    'annotations',
+)
+
+# Fields loaded from the docstring, which are only set if there's one.
+_doc_fields = (
+    'descriptions',
+    'argument_docs',
+    'aliases',
+    'alias_groups',
+)
+
+# Lookup tables derived from the fields above.
+_derived_fields = (
+    'positions',
+    'default_map',
+    'canonical_names',
+)
+
+
+def _intern(name):
+    return None if name is None else sys.intern(name)
+
+
+def _freeze(value):
+    # Sequences are compared as tuples, since parse used to return lists
+    # for some of them.
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    elif isinstance(value, dict):
+        return {key: _freeze(item) for key, item in value.items()}
+    return value
+
+
+def _make_spec(fields):
+    return Spec(**fields)
+
+
+class Spec:
+    """The spec of a callable.
+
+    It has the fields of inspect.getfullargspec, except that args,
+    kwonlyargs and defaults are always tuples, and kwonlydefaults and
+    annotations are always dicts. If the callable has a docstring, there
+    are also `descriptions`, `argument_docs`, `aliases` and `alias_groups`,
+    see classarg._doc.load_doc_hints.
+
+    The following lookup tables are precomputed:
+
+    positions:       dict from positional arguments to their positions.
+    default_map:     dict from arguments to their default values, for
+                     those with one.
+    canonical_names: dict from each switch name, i.e. the arguments, their
+                     dashed forms and the aliases, to the argument name.
+
+    Specs are immutable. The dicts in them shouldn't be modified either.
+    """
+    __slots__ = _fields + _doc_fields + _derived_fields
+
+    def __init__(self, args=(), varargs=None, varkw=None, defaults=(),
+                 kwonlyargs=(), kwonlydefaults=None, annotations=None,
+                 **doc_hints):
+        unknown = set(doc_hints).difference(_doc_fields)
+        if unknown:
+            raise TypeError('Unknown fields of Spec: {}'.format(
+                ', '.join(sorted(unknown))))
+
+        init = object.__setattr__
+        args = tuple(_intern(name) for name in args)
+        kwonlyargs = tuple(_intern(name) for name in kwonlyargs)
+        defaults = tuple(defaults or ())
+        kwonlydefaults = dict(kwonlydefaults or {})
+
+        init(self, 'args', args)
+        init(self, 'varargs', _intern(varargs))
+        init(self, 'varkw', _intern(varkw))
+        init(self, 'defaults', defaults)
+        init(self, 'kwonlyargs', kwonlyargs)
+        init(self, 'kwonlydefaults', kwonlydefaults)
+        init(self, 'annotations', dict(annotations or {}))
+
+        aliases = {}
+        if doc_hints:
+            descriptions = tuple(doc_hints.get('descriptions', ()))
+            argument_docs = dict(doc_hints.get('argument_docs', {}))
+            aliases = dict(doc_hints.get('aliases', {}))
+            alias_groups = {
+                name: tuple(switches) for name, switches
+                in doc_hints.get('alias_groups', {}).items()}
+
+            init(self, 'descriptions', descriptions)
+            init(self, 'argument_docs', argument_docs)
+            init(self, 'aliases', aliases)
+            init(self, 'alias_groups', alias_groups)
+
+        init(self, 'positions', {name: i for i, name in enumerate(args)})
+
+        default_map = dict(zip(args[len(args) - len(defaults):], defaults))
+        default_map.update(kwonlydefaults)
+        init(self, 'default_map', default_map)
+
+        canonical_names = {}
+        for name in args + kwonlyargs:
+            canonical_names[name] = name
+            canonical_names[name.replace('_', '-')] = name
+        canonical_names.update(aliases)
+        init(self, 'canonical_names', canonical_names)
+
+    @classmethod
+    def from_namespace(cls, namespace):
+        """Build a spec from an object with the attributes of a spec."""
+        if isinstance(namespace, cls):
+            return namespace
+
+        fields = {key: getattr(namespace, key)
+                  for key in _fields + _doc_fields if hasattr(namespace, key)}
+        return cls(**fields)
+
+    def asdict(self):
+        """Get the fields of the spec, excluding the lookup tables."""
+        return {key: getattr(self, key)
+                for key in _fields + _doc_fields if hasattr(self, key)}
+
+    def replace(self, **changes):
+        """Get a new spec with the given fields replaced."""
+        fields = self.asdict()
+        fields.update(changes)
+        return type(self)(**fields)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Spec is immutable, use Spec.replace")
+
+    def __delattr__(self, name):
+        raise AttributeError("Spec is immutable, use Spec.replace")
+
+    def __reduce__(self):
+        return _make_spec, (self.asdict(), )
+
+    def __eq__(self, other):
+        if isinstance(other, Spec):
+            other = other.asdict()
+        elif isinstance(other, SimpleNamespace):
+            other = {key: value for key, value in vars(other).items()
+                     if key in _fields or key in _doc_fields}
+        else:
+            return NotImplemented
+
+        return _freeze(self.asdict()) == _freeze(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'Spec({})'.format(', '.join(
+            '{}={!r}'.format(key, value)
+            for key, value in self.asdict().items()))
@@ -0,0 +1,296 @@
+"""Extract specs from source code without importing it.
+
+Importing a module runs its body, which can be slow or have side effects.
+This module builds the same spec as classarg.parse from the syntax tree of
+the source file instead. It only works for definitions whose signature can
+be determined statically:
+
+1. functions and methods without decorators other than staticmethod and
+   classmethod, whose defaults are literals, and whose annotations only
+   refer to builtins and names imported from typing as they are, e.g.
+   'List' from `from typing import List` or `typing.List`.
+
+2. classes without decorators, whose __init__ is one of the above or which
+   have no __init__ and no base classes.
+
+Like parse, methods of classes accessed as 'Class.method' keep the self
+argument, while classmethods don't take cls.
+"""
+import ast
+from types import SimpleNamespace
+
+from .utils import compatible_with
+
+__all__ = (
+    'extract_spec',
+)
+
+
+class _NotStatic(Exception):
+    pass
+
+
+def _find_definition(body, names):
+    name, rest = names[0], names[1:]
+    for node in reversed(body):  # the last definition wins
+        if getattr(node, 'name', None) != name:
+            continue
+        if rest:
+            if not isinstance(node, ast.ClassDef):
+                raise _NotStatic
+            return _find_definition(node.body, rest)
+
+        return node
+
+    raise _NotStatic
+
+
+def _literal(node):
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        raise _NotStatic
+
+
+_builtin_names = ('int', 'float', 'bool', 'str')
+
+
+def _get_bindings(tree):
+    """Get (static names, assigned names) of tree.
+
+    Static names refer to builtins or typing objects. Names bound anywhere
+    in the module other than by importing them from typing unaliased are
+    excluded, as they may refer to something else. Assigned names are
+    bound by anything but def and class statements, e.g. `main =
+    partial(main, 0)`.
+    """
+    typing_names, assigned, defined = set(), set(), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module == 'typing':
+            for alias in node.names:
+                if alias.asname in (None, alias.name):
+                    typing_names.add(alias.name)
+                else:
+                    assigned.add(alias.asname)
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                name = alias.asname or alias.name.partition('.')[0]
+                if alias.name == 'typing' and name == 'typing':
+                    typing_names.add(name)
+                else:
+                    assigned.add(name)
+        elif isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            assigned.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef,
+                               ast.ClassDef)):
+            defined.add(node.name)
+
+    static_names = (typing_names | set(_builtin_names)) - assigned - defined
+    return static_names, assigned
+
+
+def _get_constant(node):
+    if isinstance(node, ast.Constant):
+        return node.value
+
+    if not compatible_with(3, 8):  # literals have their own nodes
+        if isinstance(node, ast.Str):
+            return node.s
+        if isinstance(node, ast.NameConstant):
+            return node.value
+
+    raise _NotStatic
+
+
+def _get_subscript(node):
+    if not compatible_with(3, 9) and isinstance(node.slice, ast.Index):
+        return node.slice.value
+    return node.slice
+
+
+def _format_annotation(node, names):
+    """Get the source of an annotation, which only refers to names."""
+    if isinstance(node, ast.Name):
+        if node.id not in names:
+            raise _NotStatic
+        return node.id
+
+    elif isinstance(node, ast.Attribute):
+        if not (isinstance(node.value, ast.Name) and
+                node.value.id == 'typing' and 'typing' in names):
+            raise _NotStatic
+        return 'typing.' + node.attr
+
+    elif isinstance(node, ast.Subscript):
+        return '{}[{}]'.format(
+            _format_annotation(node.value, names),
+            _format_annotation(_get_subscript(node), names))
+
+    elif isinstance(node, ast.Tuple):
+        return ', '.join(_format_annotation(item, names)
+                         for item in node.elts)
+
+    value = _get_constant(node)
+    if value is not None and not isinstance(value, str):
+        raise _NotStatic
+
+    return repr(value)
+
+
+def _annotation(node, names):
+    from ._typing import normalize_type  # load module on demand
+
+    # String annotations are already the source of the types, and parse
+    # evaluates them in the same namespace.
+    try:
+        value = _get_constant(node)
+        if isinstance(value, str):
+            return value
+    except _NotStatic:
+        pass
+
+    # The annotation refers to the objects in the module, so it's only
+    # static if they're the ones the source is evaluated with.
+    ret = _format_annotation(node, names)
+    try:
+        normalize_type(ret)
+    except TypeError:
+        raise _NotStatic
+
+    return ret
+
+
+def _get_decorator_names(node):
+    names = []
+    for decorator in node.decorator_list:
+        if not isinstance(decorator, ast.Name):
+            raise _NotStatic
+        names.append(decorator.id)
+
+    return names
+
+
+def _drop_first_arg(spec):
+    if not spec.args:
+        raise _NotStatic  # not callable as a method
+
+    del spec.args[0]
+    return spec
+
+
+def _get_method_spec(node, names):
+    decorators = _get_decorator_names(node)
+    if decorators == ['staticmethod']:
+        return _get_function_spec(node, names)
+    elif decorators == ['classmethod']:
+        return _drop_first_arg(_get_function_spec(node, names))
+    elif not decorators:
+        return _get_function_spec(node, names)
+
+    raise _NotStatic
+
+
+def _get_class_spec(node, names):
+    # decorators like dataclass may add __init__
+    if node.decorator_list:
+        raise _NotStatic
+
+    init = None
+    for item in node.body:
+        if (isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and
+                item.name == '__init__'):
+            init = item
+
+    if init is None:
+        if any(not (isinstance(base, ast.Name) and base.id == 'object')
+               for base in node.bases) or node.keywords:
+            raise _NotStatic  # __init__ may be inherited
+
+        # the same as the spec of object.__init__
+        return SimpleNamespace(
+            args=[], varargs=None, varkw=None, defaults=tuple(),
+            kwonlyargs=tuple(), kwonlydefaults=dict(), annotations=dict())
+
+    if _get_decorator_names(init):
+        raise _NotStatic
+
+    return _drop_first_arg(_get_function_spec(init, names))
+
+
+def _get_function_spec(node, names):
+    arguments = node.args
+    args = list(getattr(arguments, 'posonlyargs', [])) + arguments.args
+    ret = {
+        'args': tuple(),
+        'varargs': None,
+        'varkw': None,
+        'defaults': tuple(),
+        'kwonlyargs': tuple(),
+        'kwonlydefaults': dict(),
+        'annotations': dict(),
+    }
+
+    # The same as getfullargspec, except that only truthy values are set.
+    if args:
+        ret['args'] = [arg.arg for arg in args]
+    if arguments.vararg is not None:
+        ret['varargs'] = arguments.vararg.arg
+    if arguments.kwarg is not None:
+        ret['varkw'] = arguments.kwarg.arg
+    if arguments.defaults:
+        ret['defaults'] = tuple(_literal(d) for d in arguments.defaults)
+    if arguments.kwonlyargs:
+        ret['kwonlyargs'] = [arg.arg for arg in arguments.kwonlyargs]
+
+    kwonlydefaults = {
+        arg.arg: _literal(default)
+        for arg, default in zip(arguments.kwonlyargs, arguments.kw_defaults)
+        if default is not None}
+    if kwonlydefaults:
+        ret['kwonlydefaults'] = kwonlydefaults
+
+    annotated = args + arguments.kwonlyargs
+    annotated.extend(arg for arg in (arguments.vararg, arguments.kwarg)
+                     if arg is not None)
+    annotations = {arg.arg: _annotation(arg.annotation, names)
+                   for arg in annotated if arg.annotation is not None}
+    if node.returns is not None:
+        annotations['return'] = _annotation(node.returns, names)
+    if annotations:
+        ret['annotations'] = annotations
+
+    return SimpleNamespace(**ret)
+
+
+def extract_spec(source, qualname='main', *, skip_type_hints=False):
+    """Extract the spec of the function or class qualname defined in source.
+
+    Return None if the spec can't be determined statically.
+    """
+    with open(source, 'rb') as f:
+        tree = ast.parse(f.read(), filename=source)
+
+    qualnames = qualname.split('.')
+    names, assigned = _get_bindings(tree)
+    try:
+        # The definition may be replaced, e.g. by a decorated one.
+        if assigned.intersection(qualnames):
+            raise _NotStatic
+
+        node = _find_definition(tree.body, qualnames)
+        if isinstance(node, ast.ClassDef):
+            spec = _get_class_spec(node, names)
+        elif not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            raise _NotStatic
+        elif len(qualnames) > 1:
+            spec = _get_method_spec(node, names)
+        else:
+            if node.decorator_list:  # decorators may change the signature
+                raise _NotStatic
+            spec = _get_function_spec(node, names)
+    except _NotStatic:
+        return None
+
+    from .core import _load_hints
+    docstring = ast.get_docstring(node, clean=False)
+    return _load_hints(spec, docstring, skip_type_hints)
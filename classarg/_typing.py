@@ -1,9 +1,15 @@
 # Some code are modified from cpython's typing module.
 from .utils import compatible_with
+from ._cache import LRUCache
 
 __all__ = (
     'normalize_type',
     'load_type_hints',
+    'compile_converter',
+    'type_cache_info',
+    'clear_type_cache',
+    'encode_type',
+    'decode_type',
     'Union',
     'Optional',
     'List',
@@ -37,9 +43,39 @@ _supported_names = {
 _aux_mapping = {}
 
 
+# Normalized types are cached by annotation strings, or by the identity
+# of other annotations. Typing objects compare equal regardless of the order
+# of Union members, which matters for conversion, so they can't be keyed by
+# value. Entries keyed by id keep the annotation alive to pin its id.
+_type_cache = LRUCache(maxsize=1024)
+_code_cache = LRUCache(maxsize=1024)
+_default_type_cache = LRUCache(maxsize=1024)
+_failed = object()
+
+
+def type_cache_info():
+    """Get the CacheInfo of the caches used in normalizing types."""
+    return {
+        'normalize_type': _type_cache.info(),
+        'compile': _code_cache.info(),
+        'infer_default_type': _default_type_cache.info(),
+        'compile_converter': _converter_cache.info(),
+    }
+
+
+def clear_type_cache():
+    _type_cache.clear()
+    _code_cache.clear()
+    _default_type_cache.clear()
+    _converter_cache.clear()
+
+
 def _eval_type_from_str(obj):
     try:
-        code = compile(obj, '<string>', 'eval')
+        code = _code_cache.get(obj)
+        if code is None:
+            code = _code_cache[obj] = compile(obj, '<string>', 'eval')
+
         ret = eval(code, dict(__builtin__=None,
                               **_supported_names))
         return normalize_type(ret)
@@ -55,7 +91,27 @@ def normalize_type(obj):
     elif obj in _builtin:
         return obj
 
-    elif isinstance(obj, str):
+    # Equal strings are the same annotation, while ids may be reused by
+    # other objects after the cached one is freed.
+    by_value = isinstance(obj, str)
+    key = obj if by_value else id(obj)
+    entry = _type_cache.get(key)
+    if entry is None or not (by_value or entry[0] is obj):
+        try:
+            ret = _normalize_type(obj)
+        except TypeError:
+            ret = _failed
+
+        entry = _type_cache[key] = (obj, ret)
+
+    if entry[1] is _failed:
+        raise TypeError('Failed to normalize {}'.format(obj))
+
+    return entry[1]
+
+
+def _normalize_type(obj):
+    if isinstance(obj, str):
         return _eval_type_from_str(obj)
 
     elif hasattr(obj, '__origin__'):
@@ -75,6 +131,50 @@ def normalize_type(obj):
     raise TypeError('Failed to normalize {}'.format(obj))
 
 
+def encode_type(obj):
+    """Encode a type from normalize_type or infer_default_type into nested
+    tuples of builtins, see decode_type.
+
+    Normalized typing objects can't be pickled, since pickling them only
+    keeps the typing constructs they're subscripted from.
+    """
+    if obj in _builtin or obj is NoneType:
+        return obj
+
+    origin = getattr(obj, '__origin__', None)
+    for name in ('Union', 'List', 'Set', 'Tuple'):
+        if origin is _supported_names[name]:
+            normalized = True
+            break
+    else:
+        for builtin, cls in _aux_mapping.items():
+            if origin is builtin and builtin is not cls:
+                name, normalized = cls._name, False
+                break
+        else:
+            raise TypeError('Failed to encode {}'.format(obj))
+
+    return name, normalized, tuple(encode_type(arg) for arg in obj.__args__)
+
+
+def decode_type(data):
+    """Rebuild the type encoded by encode_type."""
+    if not isinstance(data, tuple):
+        return data
+
+    name, normalized, args = data
+    obj = _supported_names[name][tuple(decode_type(arg) for arg in args)]
+    return normalize_type(obj) if normalized else obj
+
+
+def _get_default_type_key(value):
+    t = type(value)
+    if t is tuple:
+        return tuple(_get_default_type_key(v) for v in value)
+
+    return t
+
+
 def infer_default_type(value):
     """Infer type hint from default value.
 
@@ -84,8 +184,15 @@ def infer_default_type(value):
     if t in _builtin:
         return t
     elif t is tuple:
-        return Tuple[tuple(infer_default_type(v)
-                           for v in value)]
+        # Subscripting Tuple is expensive, so cache it by the structure of
+        # the types of value.
+        key = _get_default_type_key(value)
+        ret = _default_type_cache.get(key, _failed)
+        if ret is _failed:
+            ret = _default_type_cache[key] = Tuple[
+                tuple(infer_default_type(v) for v in value)]
+
+        return ret
 
     return None
 
@@ -118,6 +225,119 @@ def load_type_hints(spec):
     spec.annotations = ret
 
 
+def _convert_bool(value):
+    lowered = value.lower()
+    if lowered in ('1', 'true', 'yes', 'on'):
+        return True
+    elif lowered in ('0', 'false', 'no', 'off'):
+        return False
+
+    raise ValueError('Invalid boolean value {!r}'.format(value))
+
+
+def _convert_none(value):
+    if value in ('', 'None', 'none', 'null'):
+        return None
+
+    raise ValueError('Invalid None value {!r}'.format(value))
+
+
+def _compile_union(converters):
+    def convert(value):
+        for converter in converters:
+            try:
+                return converter(value)
+            except ValueError:
+                pass
+
+        raise ValueError('Invalid value {!r}'.format(value))
+
+    return convert
+
+
+def _compile_collection(container, converter):
+    def convert(value):
+        if not value:
+            return container()
+        return container(converter(v) for v in value.split(','))
+
+    return convert
+
+
+def _compile_tuple(converters):
+    size = len(converters)
+
+    def convert(value):
+        values = value.split(',')
+        if len(values) != size:
+            raise ValueError('Expect {} values but got {!r}'.format(
+                size, value))
+
+        return tuple(c(v) for c, v in zip(converters, values))
+
+    return convert
+
+
+def _compile_element_converter(obj):
+    # Collections are separated by commas, so they can't be nested.
+    if getattr(obj, '__origin__', None) in (List, Set, Tuple):
+        raise TypeError('Nested collection {} is not supported'.format(obj))
+
+    return compile_converter(obj)
+
+
+_converters = {
+    int: int,
+    float: float,
+    str: str,
+    bool: _convert_bool,
+    NoneType: _convert_none,
+}
+# Compiled converters are keyed by the identity of types, like
+# normalize_type, since Union[int, str] == Union[str, int] but they try the
+# members in different orders.
+_converter_cache = LRUCache(maxsize=1024)
+
+
+def compile_converter(obj):
+    """Compile a normalized type into a function converting a string.
+
+    The structure of the type is resolved once, so the returned function
+    doesn't inspect the type anymore. List, Set and Tuple values are
+    separated by commas. Converters are cached per type.
+    """
+    if isinstance(obj, type) and obj in _converters:
+        return _converters[obj]
+
+    entry = _converter_cache.get(id(obj))
+    if entry is None or entry[0] is not obj:
+        entry = _converter_cache[id(obj)] = (obj, _compile_converter(obj))
+
+    return entry[1]
+
+
+def _compile_converter(obj):
+    origin = getattr(obj, '__origin__', None)
+    if origin is Union:
+        # Try None last, so that Optional[str] doesn't map '' to None.
+        args = sorted(obj.__args__, key=lambda t: t is NoneType)
+        return _compile_union(tuple(compile_converter(t) for t in args))
+
+    elif origin is List:
+        return _compile_collection(
+            list, _compile_element_converter(obj.__args__[0]))
+
+    elif origin is Set:
+        return _compile_collection(
+            set, _compile_element_converter(obj.__args__[0]))
+
+    elif origin is Tuple:
+        return _compile_tuple(tuple(
+            _compile_element_converter(t) for t in obj.__args__))
+
+    raise TypeError('Failed to compile converter for {}'.format(obj))
+
+
 # The classes have two requirements:
 # 1. cls.__origin__ is typing.Class
 # 2. type(cls.__args__) is tuple
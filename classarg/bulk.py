@@ -0,0 +1,185 @@
+"""Extract the specs of many entry points in parallel.
+
+Each module is imported in a new worker process, so side effects of
+module bodies are isolated from each other, and a module crashing its
+process only fails itself. Results are yielded, or
+printed as JSON lines, as soon as each module is done. For instance,
+
+    python -m classarg.bulk --workers=8 --timeout=10 @paths.txt
+
+reads the module paths from paths.txt, one per line.
+"""
+import os
+import sys
+import json
+import signal
+import multiprocessing
+from concurrent.futures import (
+    ProcessPoolExecutor, ThreadPoolExecutor, as_completed)
+from concurrent.futures.process import BrokenProcessPool
+
+from .utils import compatible_with
+
+__all__ = (
+    'extract_many',
+)
+
+
+# Not an Exception, so that module bodies catching Exception don't swallow
+# it.
+class _Timeout(BaseException):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise _Timeout
+
+
+def _format_type(value):
+    # Typing constructs have the __name__ of their origins, e.g. 'List' for
+    # List[int], so only plain classes are named by __name__.
+    if isinstance(value, type):
+        return value.__name__
+    return repr(value)
+
+
+def _format_default(value):
+    # Results are pickled back from workers and printed as JSON, so other
+    # values, e.g. lambdas, are replaced by their repr.
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return repr(value)
+
+    return value
+
+
+def _spec_to_dict(spec):
+    ret = dict(
+        args=list(spec.args),
+        varargs=spec.varargs,
+        varkw=spec.varkw,
+        defaults=[_format_default(value) for value in spec.defaults or ()],
+        kwonlyargs=list(spec.kwonlyargs),
+        kwonlydefaults={key: _format_default(value) for key, value in
+                        (spec.kwonlydefaults or {}).items()},
+        annotations={key: _format_type(value)
+                     for key, value in spec.annotations.items()},
+    )
+
+    for key in ('descriptions', 'argument_docs', 'aliases'):
+        if hasattr(spec, key):
+            ret[key] = getattr(spec, key)
+
+    return ret
+
+
+def _extract(path, func_name, timeout, static):
+    """Extract the spec of one module. Run in worker processes."""
+    from .core import parse
+    from ._doc import get_normalized_docstring
+    from ._static import extract_spec
+    from .utils import load_module, get_qualified_attr
+
+    ret = dict(path=path, func=func_name)
+
+    # The timer interrupts the worker, which runs tasks in its main thread.
+    use_timer = timeout and hasattr(signal, 'setitimer')
+    if use_timer:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    try:
+        spec = extract_spec(path, func_name) if static else None
+        ret['static'] = spec is not None
+        if spec is None:
+            module = load_module(path)
+            spec = parse(get_qualified_attr(module, func_name), cache=False)
+
+        ret['spec'] = _spec_to_dict(spec)
+        ret['help'] = get_normalized_docstring(spec)
+    except _Timeout:
+        ret['error'] = 'Timeout after {} seconds'.format(timeout)
+    except BaseException as e:
+        ret['error'] = '{}: {}'.format(type(e).__name__, e)
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    return ret
+
+
+def _get_executor():
+    # Executors are created in the threads of extract_many, and forking a
+    # multi-threaded process is unsafe, so workers are spawned when
+    # possible.
+    if compatible_with(3, 7):
+        return ProcessPoolExecutor(
+            1, mp_context=multiprocessing.get_context('spawn'))
+
+    return ProcessPoolExecutor(1)
+
+
+def _extract_isolated(path, func_name, timeout, static):
+    # max_tasks_per_child is only available in python 3.11+, and a crash
+    # breaks all the pending tasks of a shared pool, so each module gets a
+    # pool of its own.
+    with _get_executor() as executor:
+        future = executor.submit(_extract, path, func_name, timeout, static)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            error = 'Worker process exited unexpectedly'
+        except Exception as e:  # e.g. failed to pickle the result
+            error = '{}: {}'.format(type(e).__name__, e)
+
+    return dict(path=path, func=func_name, error=error)
+
+
+def extract_many(paths, *, func='main', workers=None, timeout=None,
+                 static=False):
+    """Extract the specs of func in each of paths in worker processes.
+
+    Yield a dict for each path in the order of completion. It has `path` and
+    `func`, and either `spec` and `help`, or `error` if it fails.
+
+    workers: the number of worker processes. Default to the number of CPUs.
+    timeout: the seconds allowed for each module. Only enforced on platforms
+             with signal.setitimer.
+    static:  try extracting specs without importing modules first.
+    """
+    # Threads wait for the worker processes, so they bound the number of
+    # processes running at once.
+    with ThreadPoolExecutor(workers or os.cpu_count() or 1) as executor:
+        futures = [executor.submit(_extract_isolated, path, func, timeout,
+                                   static)
+                   for path in paths]
+
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(*paths, func='main', workers: int = 0, timeout: float = 0.0,
+         static=False):
+    """Extract the specs of entry points and print them as JSON lines.
+
+    paths:    the module paths. Use @FILE to read paths from FILE.
+    func:     the name of the entry point in each module.
+    workers:  the number of worker processes. Default to the number of CPUs.
+    timeout:  the seconds allowed for each module. No limit if 0.
+    static:   try extracting specs without importing modules first.
+    -j:       --workers
+    """
+    failed = False
+    results = extract_many(paths, func=func, workers=workers,
+                           timeout=timeout, static=static)
+    for result in results:
+        failed = failed or 'error' in result
+        print(json.dumps(result, default=repr), flush=True)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    from .core import run
+    sys.exit(run(main, fromfile_prefix='@'))
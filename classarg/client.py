@@ -0,0 +1,63 @@
+"""The client of classarg.server.
+
+It only imports modules needed to talk to the server, so it starts as fast
+as the interpreter does. For instance,
+
+    python -m classarg.client /tmp/tool.sock build x --jobs=2
+
+prints the output of the command and exits with its status.
+"""
+import os
+import sys
+import json
+import socket
+
+__all__ = (
+    'call',
+)
+
+
+def call(path, argv, cwd=None):
+    """Run argv on the server listening at path.
+
+    Return a dict with the exit `status`, `stdout` and `stderr` of the
+    command. cwd defaults to the current directory.
+    """
+    request = dict(argv=list(argv), cwd=cwd or os.getcwd())
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        with sock.makefile('rwb') as f:
+            f.write(json.dumps(request).encode('utf-8') + b'\n')
+            f.flush()
+            line = f.readline()
+
+    if not line:
+        raise ConnectionError('The server closed the connection')
+
+    return json.loads(line.decode('utf-8'))
+
+
+_usage = 'usage: python -m classarg.client SOCKET COMMAND [ARGS...]'
+
+
+def main(argv):
+    # Arguments are parsed by hand, since importing classarg.core to parse
+    # them would defeat the purpose of the server.
+    if not argv or argv[0] in ('-h', '--help'):
+        print(_usage, file=sys.stderr if not argv else sys.stdout)
+        return 2 if not argv else 0
+
+    try:
+        response = call(argv[0], argv[1:])
+    except OSError as e:
+        print('error: {}'.format(e), file=sys.stderr)
+        return 2
+
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    return response['status']
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,171 @@
+"""Shell completion of the switches of classarg apps.
+
+The switches and aliases of an entry point are collected into a sorted
+index, which is stored next to the source file like .pyc files. Completion
+queries only read the index, so the target module is imported and its
+docstring parsed only when the index is missing or stale. For instance,
+
+    python -m classarg.completion path/to/tool.py --ver
+
+prints the switches of `main` in tool.py starting with '--ver', one per line.
+"""
+import os
+import sys
+import json
+from bisect import bisect_left
+
+from ._cache import get_cache_path, get_source_stamp
+
+__all__ = (
+    'build_index',
+    'complete',
+    'get_index',
+)
+
+
+# Bump this whenever the layout of the index changes.
+_index_format = 1
+
+
+def build_index(spec):
+    """Build the completion index of a spec.
+
+    The index is a dict with sorted `switches` and the first line of the
+    doc of each switch in `docs`.
+    """
+    from ._doc import _prefix_key
+
+    argument_docs = getattr(spec, 'argument_docs', {})
+    entries = {}
+
+    def add(switch, name):
+        entries[switch] = argument_docs.get(name, '').split('\n', 1)[0]
+
+    for name in list(spec.args) + list(spec.kwonlyargs):
+        add(_prefix_key(name), name)
+        if '_' in name:
+            add(_prefix_key(name.replace('_', '-')), name)
+
+    for alias, source in getattr(spec, 'aliases', {}).items():
+        add(_prefix_key(alias), source)
+
+    switches = sorted(entries)
+    return dict(switches=switches,
+                docs=[entries[switch] for switch in switches])
+
+
+def complete(index, prefix):
+    """Get the switches in the index starting with prefix and their docs."""
+    switches, docs = index['switches'], index['docs']
+
+    ret = []
+    for i in range(bisect_left(switches, prefix), len(switches)):
+        if not switches[i].startswith(prefix):
+            break
+        ret.append((switches[i], docs[i]))
+
+    return ret
+
+
+def _get_index_path(source, func_name):
+    return get_cache_path(source, func_name, 'completion.json')
+
+
+def _load_index(source, path):
+    try:
+        stamp = list(get_source_stamp(source, _index_format))
+        with open(path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if index.get('stamp') != stamp:
+        return None
+
+    return index
+
+
+def _dump_index(source, path, index):
+    tmp_path = '{}.{}'.format(path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def get_index(source, func_name='main'):
+    """Get the completion index of func_name defined in the source file.
+
+    The persisted index is used if it's up to date. Otherwise, the index is
+    built from the spec extracted statically from the source, or by importing
+    the module if that's not possible, and then persisted.
+    """
+    source = os.path.abspath(source)
+    path = _get_index_path(source, func_name)
+
+    index = _load_index(source, path)
+    if index is not None:
+        return index
+
+    from ._static import extract_spec
+
+    stamp = list(get_source_stamp(source, _index_format))
+    spec = extract_spec(source, func_name)
+    if spec is None:
+        from .core import parse
+        from .utils import load_module, get_qualified_attr
+
+        spec = parse(get_qualified_attr(load_module(source), func_name))
+
+    index = build_index(spec)
+    index['stamp'] = stamp
+
+    _dump_index(source, path, index)
+    return index
+
+
+_usage = """usage: python -m classarg.completion [--func=NAME] [--describe] \
+[--] SOURCE [PREFIX]
+
+Print the switches of the entry point NAME (default: main) in SOURCE
+starting with PREFIX. With --describe, each switch is followed by a tab
+and its doc. Use -- if PREFIX starts with --func, --describe or --help."""
+
+
+def main(argv):
+    # Arguments are parsed by hand, since importing classarg.core to parse
+    # them would cost more than answering the query.
+    func_name, describe, positional = 'main', False, []
+    for i, arg in enumerate(argv):
+        if arg == '--':
+            positional.extend(argv[i+1:])
+            break
+        elif arg.startswith('--func='):
+            func_name = arg[len('--func='):]
+        elif arg == '--describe':
+            describe = True
+        elif arg in ('-h', '--help'):
+            print(_usage)
+            return 0
+        else:
+            positional.append(arg)
+
+    if len(positional) not in (1, 2):
+        print(_usage, file=sys.stderr)
+        return 2
+
+    source, prefix = positional[0], ''.join(positional[1:])
+    for switch, doc in complete(get_index(source, func_name), prefix):
+        print('{}\t{}'.format(switch, doc) if describe else switch)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,15 +1,30 @@
+import os
 import re
 import sys
+from itertools import chain, islice
 from types import SimpleNamespace
 from inspect import getfullargspec, isfunction, ismethod, isclass
 
-from ._doc import load_doc_hints
+from .utils import compatible_with
+from ._spec import Spec
+from ._cache import LRUCache, get_spec_path, load_spec, dump_spec
 
 __all__ = (
     'match',
+    'match_many',
     'run',
+    'run_async',
     'parse',
     'validate',
+    'validate_many',
+    'validate_async',
+    'clear_cache',
+    'profile',
+    'compile_matcher',
+    'iter_args',
+    'LazyArgs',
+    'Matcher',
+    'Spec',
     'ArgumentError',
 )
 
@@ -18,12 +33,192 @@ class ArgumentError(Exception):
     pass
 
 
-def validate(func, kwargs):
-    if not hasattr(func, '_classarg_val'):
+def _compile_rule(rule, spec):
+    # Rules bound by classarg.validation are partial objects. A rule may
+    # define `compile(*args, spec, **kwargs)` returning a function of the
+    # matcher, which precomputes whatever only depends on the spec.
+    compile_rule = getattr(getattr(rule, 'func', None), 'compile', None)
+    if compile_rule is not None:
+        return compile_rule(*rule.args, spec=spec, **rule.keywords)
+
+    def check(matcher):
+        return rule(spec=spec, matcher=matcher)
+
+    return check
+
+
+def _compile_batch_rule(rule, spec, check):
+    # The compiled check may have a batch attribute, a function from a list
+    # of matchers to their errors. Other rules are checked one matcher at a
+    # time with check.
+    check_many = getattr(check, 'batch', None)
+    if check_many is not None:
+        return check_many
+
+    def check_many(matchers):
+        errors = []
+        for matcher in matchers:
+            try:
+                check(matcher)
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+
+        return errors
+
+    return check_many
+
+
+if compatible_with(3, 5):
+    from inspect import iscoroutinefunction
+else:
+    def iscoroutinefunction(func):
+        return False  # async functions are added in python 3.5
+
+
+def _check_async_support():
+    if not compatible_with(3, 5):
+        raise NotImplementedError('Async functions require python >= 3.5')
+
+
+def _is_async_rule(rule):
+    # Async rules are coroutine functions. If they define compile, it should
+    # return coroutine functions as well.
+    return iscoroutinefunction(getattr(rule, 'func', rule))
+
+
+def _is_async_callable(func):
+    if iscoroutinefunction(func):
+        return True
+
+    # instances with an async __call__
+    call = getattr(func, '__call__', None)
+    return not isclass(func) and iscoroutinefunction(call)
+
+
+def _compile_validator(rules, spec):
+    """Compile rules into a single validator.
+
+    Return None if there are no rules. The compiled rules are stored in
+    validator.rules, and validator.batch validates a list of matchers,
+    returning the first error of each matcher or None.
+
+    If any of the rules is async, validator.is_async is True, and the
+    checks in validator.checks should be awaited by validate_async instead.
+    """
+    rules = tuple(rules)
+    if not rules:
+        return None
+
+    checks = tuple(_compile_rule(rule, spec) for rule in rules)
+    if any(_is_async_rule(rule) for rule in rules):
+        def validator(matcher):
+            raise TypeError('Async rules should be awaited, '
+                            'use validate_async or run')
+
+        def validate_batch(matchers):
+            raise TypeError('Async rules cannot be checked in batches, '
+                            'await validate_async for each matcher')
+
+        validator.rules = rules
+        validator.checks = checks
+        validator.is_async = True
+        validator.batch = validate_batch
+        return validator
+
+    batch_checks = tuple(_compile_batch_rule(rule, spec, check)
+                         for rule, check in zip(rules, checks))
+
+    def validator(matcher):
+        for check in checks:
+            check(matcher)
+
+    def validate_batch(matchers):
+        errors = [None] * len(matchers)
+        for check_many in batch_checks:
+            # Only matchers without errors are passed to the next rule.
+            pending = [i for i, error in enumerate(errors) if error is None]
+            if not pending:
+                break
+
+            results = check_many([matchers[i] for i in pending])
+            for i, error in zip(pending, results):
+                errors[i] = error
+
+        return errors
+
+    validator.rules = rules
+    validator.checks = checks
+    validator.is_async = False
+    validator.batch = validate_batch
+    return validator
+
+
+def _get_matcher_dict(spec, args, kwargs):
+    """Map the names of the spec to the matched values."""
+    npos = len(spec.args)
+    matcher = dict(zip(spec.args, args))
+    if spec.varargs is not None:
+        matcher[spec.varargs] = tuple(args[npos:])
+    matcher.update(kwargs)
+
+    return matcher
+
+
+def validate(func, matcher, *, spec=None, **options):
+    """Validate the matched values of func with its rules.
+
+    matcher: dict from argument names to their values.
+
+    The rules are compiled once into a single validator, which is cached
+    with the spec of func until the rules change.
+    """
+    rules = getattr(func, '_classarg_val', None)
+    if not rules:
         return
 
-    for validate_func in func._classarg_val:
-        validate_func(func=func, match=kwargs)
+    _get_validator(func, rules, spec, options)(matcher)
+
+
+def _get_validator(func, rules, spec, options):
+    skip_type_hints = options.get('skip_type_hints', False)
+    entry = _get_cache_entry(func, skip_type_hints, options.get('persist'))
+    if entry is None:  # unhashable callable
+        spec = spec or parse(func, skip_type_hints=skip_type_hints)
+        return _compile_validator(rules, spec)
+
+    # rules is a snapshot; rules attached meanwhile replace the attribute of
+    # func and are compiled on the next call.
+    validator = entry[3]
+    if validator is None or validator.rules != tuple(rules):
+        validator = entry[3] = _compile_validator(rules, spec or entry[1])
+
+    return validator
+
+
+def validate_many(func, matchers, *, spec=None, **options):
+    """Validate a list of matched values of func with its rules.
+
+    Return a list with the first error of each matcher, or None if it's
+    valid. Rules with a batch form check all matchers at once. Raise
+    TypeError if any of the rules is async.
+    """
+    matchers = list(matchers)
+    rules = getattr(func, '_classarg_val', None)
+    if not rules:
+        return [None] * len(matchers)
+
+    return _get_validator(func, rules, spec, options).batch(matchers)
+
+
+def validate_async(func, matcher, *, spec=None, **options):
+    """Get an awaitable validating matcher with both sync and async rules.
+
+    See validate.
+    """
+    _check_async_support()
+    from ._async import validate_async  # load module on demand
+    return validate_async(func, matcher, spec=spec, **options)
 
 
 def _get_normalized_spec(func):
@@ -72,6 +267,102 @@ def _get_arg_spec(func):
     return SimpleNamespace(**ret)
 
 
+# Specs are cached by the callable itself. Each entry also stores a
+# fingerprint of the underlying function, so that redefining the code,
+# docstring, annotations or defaults of a cached callable won't return a
+# stale spec.
+_spec_cache = LRUCache(maxsize=256)
+
+
+def _get_spec_target(func):
+    if isfunction(func):
+        return func
+    elif ismethod(func):
+        return func.__func__
+    elif isclass(func):
+        return func.__init__
+    elif hasattr(func, '__call__'):
+        return getattr(func.__call__, '__func__', func.__call__)
+
+    return None
+
+
+def _get_fingerprint(func):
+    target = _get_spec_target(func)
+    annotations = getattr(target, '__annotations__', None) or {}
+    kwdefaults = getattr(target, '__kwdefaults__', None) or {}
+
+    return (
+        target,
+        getattr(target, '__code__', None),
+        getattr(target, '__defaults__', None),
+        tuple(kwdefaults.items()),
+        tuple(annotations.items()),
+        getattr(func, '__doc__', None),
+    )
+
+
+def _get_persist_location(func, skip_type_hints):
+    """Get (sources, path) of the persisted spec of func, or None.
+
+    The spec is stored next to the module defining func, and identified by
+    the qualified name of func there. It's stamped with every source file
+    it's derived from, since __init__ may be inherited from another module.
+    """
+    target = _get_spec_target(func)
+    code = getattr(target, '__code__', None)
+    if code is None:
+        return None
+
+    if isfunction(func):
+        kind, owner = 'function', func
+    elif ismethod(func):
+        kind, owner = 'method', func
+    elif isclass(func):
+        kind, owner = 'class', func
+    else:
+        kind, owner = 'instance', type(func)
+
+    qualname = getattr(owner, '__qualname__', '')
+    # Local definitions are not identified by their qualified names.
+    if not qualname or '<locals>' in qualname:
+        return None
+
+    module_name = getattr(owner, '__module__', None)
+    source = getattr(sys.modules.get(module_name), '__file__', None)
+    if source is None and getattr(target, '__module__', None) == module_name:
+        # e.g. modules executed without being imported
+        source = code.co_filename
+    if not source or not source.endswith('.py'):
+        return None
+
+    sources = (source, )
+    if code.co_filename != source:
+        sources += (code.co_filename, )
+    if not all(os.path.isfile(path) for path in sources):
+        return None
+
+    name = '{}-{}{}'.format(
+        qualname, kind, '-untyped' if skip_type_hints else '')
+    return sources, get_spec_path(source, name)
+
+
+def clear_cache(func=None):
+    """Invalidate cached specs.
+
+    func: only invalidate specs of this callable. If None, clear all.
+    """
+    if func is None:
+        _spec_cache.clear()
+        return
+
+    for skip_type_hints in (False, True):
+        try:
+            _spec_cache.pop((func, skip_type_hints))
+        except TypeError:  # unhashable callable, never cached
+            return
+
+
 # We follow this cheat sheet
 # http://mypy.readthedocs.io/en/stable/cheat_sheet_py3.html#built-in-types
 # but only support the following types
@@ -84,19 +375,113 @@ def _get_arg_spec(func):
 #
 # 3. misc:
 #    Union, Optional
-def parse(func, *, skip_type_hints=False):
+#
+# The returned spec is cached and shared between calls, so it should be
+# treated as read-only. Pass cache=False to always build a new one.
+#
+# With persist=True (or the environment variable CLASSARG_PERSIST_SPECS set),
+# specs are also stored next to the source of func, like .pyc files, and
+# reused by later processes until the source file changes.
+def parse(func, *, skip_type_hints=False, cache=True, persist=None):
+    if not cache:
+        return _load_or_parse(func, skip_type_hints, persist)
+
+    entry = _get_cache_entry(func, skip_type_hints, persist)
+    if entry is None:  # unhashable callable
+        return _load_or_parse(func, skip_type_hints, persist)
+
+    return entry[1]
+
+
+def _get_cache_entry(func, skip_type_hints, persist):
+    """Get the cache entry [fingerprint, spec, matcher, validator] of func.
+
+    Return None if func can't be cached.
+    """
+    key = (func, skip_type_hints)
+    try:
+        entry = _spec_cache.get(key)
+    except TypeError:  # unhashable callable
+        return None
+
+    fingerprint = _get_fingerprint(func)
+    if entry is not None and entry[0] == fingerprint:
+        return entry
+
+    spec = _load_or_parse(func, skip_type_hints, persist)
+    entry = [fingerprint, spec, None, None]
+    _spec_cache[key] = entry
+
+    return entry
+
+
+def _load_or_parse(func, skip_type_hints, persist):
+    if persist is None:
+        persist = bool(os.environ.get('CLASSARG_PERSIST_SPECS'))
+
+    location = None
+    if persist:
+        location = _get_persist_location(func, skip_type_hints)
+
+    if location is not None:
+        spec = _load_persisted_spec(location)
+        if spec is not None:
+            return spec
+
+    spec = _parse(func, skip_type_hints)
+    if location is not None:
+        _dump_persisted_spec(location, spec)
+
+    return spec
+
+
+# Normalized types are persisted in the encoded form of _typing, since
+# pickling them loses the normalization.
+def _load_persisted_spec(location):
+    spec = load_spec(*location)
+    if spec is None:
+        return None
+
+    from ._typing import decode_type  # load module on demand
+    try:
+        return spec.replace(annotations={
+            key: decode_type(value)
+            for key, value in spec.annotations.items()})
+    except (TypeError, KeyError, ValueError):
+        return None
+
+
+def _dump_persisted_spec(location, spec):
+    from ._typing import encode_type  # load module on demand
+    try:
+        annotations = {key: encode_type(value)
+                       for key, value in spec.annotations.items()}
+    except TypeError:
+        return
+
+    dump_spec(location[0], location[1], spec.replace(annotations=annotations))
+
+
+def _parse(func, skip_type_hints):
     spec = _get_normalized_spec(func)
+    docstring = func.__doc__ if hasattr(func, '__doc__') else None
+
+    return _load_hints(spec, docstring, skip_type_hints)
+
 
+def _load_hints(spec, docstring, skip_type_hints):
+    """Load the hints into the draft spec and build the Spec."""
     if skip_type_hints:
         spec.annotations = {}
     else:
         from ._typing import load_type_hints  # load module on demand
         load_type_hints(spec)
 
-    if hasattr(func, '__doc__') and func.__doc__:
-        load_doc_hints(spec, func.__doc__)
+    if docstring:
+        from ._doc import load_doc_hints  # load module on demand
+        load_doc_hints(spec, docstring)
 
-    return spec
+    return Spec.from_namespace(spec)
 
 
 pattern = re.compile(r'^-{1,2}([^\d\W][\w-]*)(?==?(\S*))')
@@ -116,41 +501,426 @@ def _parse_one_arg(arg): # noqa
     return {key: value}
 
 
-def _match_args(spec, args):
-    ret_args, ret_kwargs = [], {}
-    in_vargs = False
+_missing = object()
+
+
+def _get_converter(annotation):
+    if annotation is None:
+        return str
+
+    from ._typing import compile_converter  # load module on demand
+    try:
+        return compile_converter(annotation)
+    except TypeError:
+        return str
+
+
+def _is_number(arg):
+    try:
+        float(arg)
+    except ValueError:
+        return False
+
+    return True
+
+
+def _get_varargs_type(annotation):
+    # *args: List[int] is commonly used to mean *args: int
+    if hasattr(annotation, '__origin__'):
+        from ._typing import List, Set
+        if annotation.__origin__ in (List, Set):
+            return annotation.__args__[0]
+
+    return annotation
+
+
+class LazyArgs:
+    """A single-pass iterator over the values of *varargs.
+
+    Each argument is converted to `type` only when it's consumed, so
+    arbitrarily many values can be processed in constant memory. Switches
+    can't appear among the values, unless they're after `--`.
+
+    name:     the name of the *varargs parameter
+    type:     the normalized type of each value, or None
+    consumed: the number of values consumed so far
+    """
+    def __init__(self, name, type, converter, args, only_positional=False):
+        self.name = name
+        self.type = type
+        self.consumed = 0
+
+        self._converter = converter
+        self._args = args
+        self._only_positional = only_positional
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        for arg in self._args:
+            if (not self._only_positional and
+                    arg[:1] == '-' and arg != '-'):
+                if arg == '--':
+                    self._only_positional = True
+                    continue
+
+                if not _is_number(arg):
+                    raise ArgumentError(
+                        "Switch '{}' should precede the values of '{}'".format(
+                            arg, self.name))
+
+            try:
+                value = self._converter(arg)
+            except (TypeError, ValueError):
+                raise ArgumentError(
+                    "Invalid value {!r} for '{}' at position {}".format(
+                        arg, self.name, self.consumed))
+
+            self.consumed += 1
+            return value
+
+        raise StopIteration
+
+    def __repr__(self):
+        return '<LazyArgs {} of {}, {} consumed>'.format(
+            self.name, self.type, self.consumed)
+
+
+class Matcher:
+    """Match argv against a spec with precomputed lookup tables.
+
+    Every parameter gets a slot. Positional parameters take the first slots
+    in order, followed by keyword-only parameters. Each accepted switch,
+    including the dashed form of names and the aliases in the docstring,
+    maps to a (name, slot, converter, is_flag) entry, so matching a token
+    is a single dictionary lookup.
+    """
+    def __init__(self, spec):
+        self.spec = spec = Spec.from_namespace(spec)
+
+        annotations = spec.annotations
+        names = spec.args + spec.kwonlyargs
+        self._names = names
+        self._npos = len(spec.args)
+
+        default_map = spec.default_map
+        self._defaults = defaults = tuple(
+            default_map.get(name, _missing) for name in names)
+
+        self._converters = tuple(
+            _get_converter(annotations.get(name)) for name in names)
+
+        entries = {}
+        for slot, name in enumerate(names):
+            annotation = annotations.get(name)
+            is_flag = (annotation is bool or
+                       (annotation is None and
+                        isinstance(defaults[slot], bool)))
+            entries[name] = (name, slot, self._converters[slot], is_flag)
+
+        # Aliases of names not in the spec go to **kwargs.
+        self._switches = {
+            switch: entries.get(name, (name, None, None, False))
+            for switch, name in spec.canonical_names.items()}
+
+        if spec.varargs is not None:
+            self._varargs_type = _get_varargs_type(
+                annotations.get(spec.varargs))
+            self._varargs_converter = _get_converter(self._varargs_type)
+        else:
+            self._varargs_type = None
+            self._varargs_converter = None
+
+    def _convert(self, name, converter, value):
+        try:
+            return converter(value)
+        except (TypeError, ValueError):
+            raise ArgumentError(
+                "Invalid value {!r} for '{}'".format(value, name))
+
+    def match(self, args, lazy_varargs=False):
+        """Match args, which can be any iterable of strings.
+
+        If lazy_varargs is True, the values of *varargs are not collected.
+        Instead, the variable arguments consist of a single iterator which
+        consumes the rest of args on demand, so all switches should precede
+        them.
+        """
+        names, npos, switches = self._names, self._npos, self._switches
+        values = [_missing] * len(names)
+        extra_args, extra_kwargs = [], {}
+        lazy = None
+        position = 0
+        only_positional = False
+
+        it = iter(args)
+        for arg in it:
+            if not only_positional and arg[:1] == '-' and arg != '-':
+                if arg == '--':
+                    only_positional = True
+                    continue
+
+                key = arg[2:] if arg[:2] == '--' else arg[1:]
+                key, sep, value = key.partition('=')
+                entry = switches.get(key)
+
+                if entry is None and _is_number(arg):
+                    pass  # negative numbers are positional arguments
+
+                elif entry is None or entry[1] is None:
+                    # switches not in the spec go to **kwargs
+                    if self.spec.varkw is None:
+                        raise ArgumentError(
+                            "Unknown switch '{}'".format(arg))
+                    if pattern.search(arg) is None:
+                        raise ArgumentError(
+                            "Invalid switch '{}'".format(arg))
+
+                    key = key if entry is None else entry[0]
+                    extra_kwargs[key] = value if sep else True
+                    continue
+
+                else:
+                    name, slot, converter, is_flag = entry
+                    if not sep:
+                        if is_flag:
+                            values[slot] = True
+                            continue
+
+                        value = next(it, _missing)
+                        if value is _missing:
+                            raise ArgumentError(
+                                "Switch '{}' expects a value".format(arg))
+
+                    values[slot] = self._convert(name, converter, value)
+                    continue
+
+            while position < npos and values[position] is not _missing:
+                position += 1
+
+            if position < npos:
+                values[position] = self._convert(
+                    names[position], self._converters[position], arg)
+                position += 1
+            elif self._varargs_converter is not None:
+                if lazy_varargs:
+                    lazy = LazyArgs(
+                        self.spec.varargs, self._varargs_type,
+                        self._varargs_converter, chain((arg, ), it),
+                        only_positional)
+                    break
+
+                extra_args.append(self._convert(
+                    self.spec.varargs, self._varargs_converter, arg))
+            else:
+                raise ArgumentError(
+                    "Unexpected argument '{}'".format(arg))
+
+        if lazy_varargs and self._varargs_converter is not None:
+            if lazy is None:
+                lazy = LazyArgs(
+                    self.spec.varargs, self._varargs_type,
+                    self._varargs_converter, iter(()), only_positional)
+            extra_args.append(lazy)
+
+        for slot, value in enumerate(values):
+            if value is _missing:
+                value = self._defaults[slot]
+                if value is _missing:
+                    raise ArgumentError(
+                        "Missing argument '{}'".format(names[slot]))
+                values[slot] = value
+
+        ret_args = values[:npos]
+        ret_args.extend(extra_args)
+        ret_kwargs = dict(zip(names[npos:], values[npos:]))
+        ret_kwargs.update(extra_kwargs)
+
+        return ret_args, ret_kwargs
+
+
+def compile_matcher(func, **options):
+    """Get the compiled Matcher of func, a spec or a Matcher.
+
+    Matchers of callables are cached together with their specs.
+    """
+    if isinstance(func, Matcher):
+        return func
+    elif isinstance(func, (Spec, SimpleNamespace)):
+        return Matcher(func)
+
+    skip_type_hints = options.get('skip_type_hints', False)
+    persist = options.get('persist')
+
+    entry = _get_cache_entry(func, skip_type_hints, persist)
+    if entry is None:  # unhashable callable
+        return Matcher(parse(func, skip_type_hints=skip_type_hints,
+                             persist=persist))
 
+    if entry[2] is None:
+        entry[2] = Matcher(entry[1])
+
+    return entry[2]
+
+
+def _iter_file_args(path, fromfile_prefix):
+    try:
+        f = sys.stdin if path == '-' else open(path)
+    except OSError as e:
+        raise ArgumentError(
+            "Cannot read arguments from '{}': {}".format(path, e))
+
+    try:
+        lines = (line.rstrip('\r\n') for line in f)
+        yield from iter_args(
+            (line for line in lines if line),
+            fromfile_prefix=fromfile_prefix)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def iter_args(args, *, fromfile_prefix='@'):
+    """Iterate args lazily, expanding argument files.
+
+    An argument like `@path` is replaced by the lines in the file, one
+    argument per line. `@-` reads arguments from stdin. Files are read on
+    demand, so arbitrarily long argument lists take constant memory.
+    """
+    prefix_len = len(fromfile_prefix)
     for arg in args:
-        arg = _parse_one_arg(arg)
+        if arg.startswith(fromfile_prefix) and len(arg) > prefix_len:
+            yield from _iter_file_args(arg[prefix_len:], fromfile_prefix)
+        else:
+            yield arg
 
 
-    return ret_args, ret_kwargs
+def _match_args(spec, args):
+    return compile_matcher(spec).match(args)
 
 
+# Besides the options of parse, match accepts
+#
+# fromfile_prefix: expand argument files, see iter_args
+# lazy_varargs:    pass *varargs as a single iterator, see Matcher.match
 def match(func, *, args=None, **options):
     args = args if args is not None else sys.argv[1:]
-    if isinstance(func, SimpleNamespace):
-        spec = func
-    else:
-        skip_type_hints = options.get('skip_type_hints', False)
-        spec = parse(func, skip_type_hints)
+    matcher = compile_matcher(func, **options)
+
+    fromfile_prefix = options.get('fromfile_prefix')
+    if fromfile_prefix:
+        args = iter_args(args, fromfile_prefix=fromfile_prefix)
 
-    matcher_args, matcher_kwargs = _match_args(spec, args)
+    matcher_args, matcher_kwargs = matcher.match(
+        args, lazy_varargs=options.get('lazy_varargs', False))
 
     # TODO: validate matcher
 
     return matcher_args, matcher_kwargs
 
 
+_batch_size = 1024
+
+
+def match_many(func, argvs, *, collect_errors=False, check=True,
+               **options):
+    """Match many argv vectors against the spec of func.
+
+    The spec is parsed and compiled once. Yield (args, kwargs) for each argv.
+    If collect_errors is True, the error of an argv is yielded in place of
+    its result instead of being raised. It's an ArgumentError if the argv
+    fails to match, or the error of the first failed rule of func.
+
+    check: validate the results with the rules of func. They're validated in
+           batches of argvs, so results are yielded batch by batch.
+           TypeError is raised before matching if any rule is async.
+    """
+    matcher = compile_matcher(func, **options)
+    match_one = matcher.match
+
+    def match_all(argvs):
+        for argv in argvs:
+            try:
+                yield match_one(argv)
+            except ArgumentError as e:
+                if not collect_errors:
+                    raise
+                yield e
+
+    rules = getattr(func, '_classarg_val', None)
+    if not check or not rules:
+        yield from match_all(argvs)
+        return
+
+    if _get_validator(func, rules, matcher.spec, options).is_async:
+        raise TypeError('Async rules cannot be checked by match_many, pass '
+                        'check=False and await validate_async instead')
+
+    results = match_all(argvs)
+    while True:
+        batch = list(islice(results, _batch_size))
+        if not batch:
+            return
+
+        matched = [i for i, result in enumerate(batch)
+                   if not isinstance(result, ArgumentError)]
+        errors = validate_many(func, [
+            _get_matcher_dict(matcher.spec, *batch[i]) for i in matched],
+            spec=matcher.spec, **options)
+
+        for i, error in zip(matched, errors):
+            if error is not None:
+                if not collect_errors:
+                    raise error
+                batch[i] = error
+
+        yield from batch
+
+
+def profile():
+    """Get a Profile recording the phases of classarg calls while active.
+
+    See classarg._profile for details.
+    """
+    from ._profile import Profile  # load module on demand
+    return Profile()
+
+
 def run(func, *, args=None, **options):
-    skip_type_hints = options.get('skip_type_hints', False)
+    # CLASSARG_PROFILE=PATH dumps the profile of the run to PATH.
+    path = os.environ.get('CLASSARG_PROFILE')
+    if path:
+        from ._profile import run_profiled  # load module on demand
+        return run_profiled(path, func, args, options)
+
+    return _run(func, args, options)
+
+
+def run_async(func, *, args=None, **options):
+    """Get an awaitable running func, which may be async, with args.
+
+    Async rules of func are awaited as well.
+    """
+    _check_async_support()
+    from ._async import run_async  # load module on demand
+    return run_async(func, args=args, **options)
+
+
+def _run(func, args, options):
+    rules = getattr(func, '_classarg_val', None)
+    validator = rules and _get_validator(func, rules, None, options)
+
+    # Async functions and rules are run on an event loop. Within a running
+    # loop, the awaitable is returned instead.
+    if _is_async_callable(func) or (validator and validator.is_async):
+        from ._async import run_on_loop  # load module on demand
+        return run_on_loop(run_async(func, args=args, **options))
 
-    spec = parse(func,
-                 args=args,
-                 skip_type_hints=skip_type_hints)
-    matcher = match(spec,
-                    args=args,
-                    skip_type_hints=skip_type_hints)
-    validate(func, matcher)
+    matcher = compile_matcher(func, **options)
+    matcher_args, matcher_kwargs = match(matcher, args=args, **options)
+    if validator:
+        validator(_get_matcher_dict(
+            matcher.spec, matcher_args, matcher_kwargs))
 
-    return func()
+    return func(*matcher_args, **matcher_kwargs)
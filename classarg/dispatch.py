@@ -0,0 +1,205 @@
+"""Dispatch subcommands to entry points which are imported on demand.
+
+Subcommands map to targets like 'package.module:function'. Only the module
+of the selected subcommand is imported and parsed. The summaries listed by
+`--help` are read from a prebuilt manifest, so listing subcommands doesn't
+import any of them. For instance,
+
+    tool = Dispatcher({
+        'build': 'tool.build:main',
+        'serve': 'tool.server:Server',
+    }, manifest='tool/manifest.json')
+
+    if __name__ == '__main__':
+        tool.run()
+
+Call `tool.build_manifest()` whenever subcommands or their docstrings change.
+"""
+import sys
+import json
+
+__all__ = (
+    'Dispatcher',
+)
+
+
+def _load_target(target):
+    from importlib import import_module
+    from .utils import get_qualified_attr
+
+    module_name, sep, qualname = target.partition(':')
+    if not sep or not module_name or not qualname:
+        raise ValueError(
+            "Target '{}' should be like 'module:function'".format(target))
+
+    return get_qualified_attr(import_module(module_name), qualname)
+
+
+def _extract_target_spec(target):
+    """Extract the spec of a target without importing its module.
+
+    Return None if it's not possible. Parent packages are still imported to
+    locate the module.
+    """
+    from importlib.util import find_spec
+    from ._static import extract_spec
+
+    module_name, _, qualname = target.partition(':')
+    try:
+        module_spec = find_spec(module_name)
+    except (ImportError, ValueError):
+        return None
+
+    if (module_spec is None or not module_spec.has_location or
+            not module_spec.origin.endswith('.py')):
+        return None
+
+    return extract_spec(module_spec.origin, qualname)
+
+
+def _get_summary(spec):
+    descriptions = getattr(spec, 'descriptions', None)
+    if not descriptions:
+        return ''
+
+    return descriptions[0].split('\n', 1)[0]
+
+
+def _asks_for_help(args):
+    for arg in args:
+        if arg == '--':
+            return False
+        elif arg in ('-h', '--help'):
+            return True
+
+    return False
+
+
+class Dispatcher:
+    """Run the subcommand named by the first argument.
+
+    commands: dict from subcommand names to targets like 'module:function'.
+              Callables are also accepted.
+    manifest: path of the JSON manifest with the summaries of subcommands.
+    prog:     the program name in help. Default to sys.argv[0].
+    """
+    def __init__(self, commands, *, manifest=None, prog=None):
+        self.commands = dict(commands)
+        self.manifest = manifest
+        self.prog = prog
+        self._loaded = {}
+        self._summaries = None
+
+    def load(self, name):
+        """Import and return the entry point of a subcommand."""
+        if name not in self._loaded:
+            target = self.commands[name]
+            self._loaded[name] = (_load_target(target)
+                                  if isinstance(target, str) else target)
+
+        return self._loaded[name]
+
+    def build_manifest(self, path=None):
+        """Import all subcommands and write their summaries to the manifest.
+
+        path: default to self.manifest. If both are None, nothing is
+              written.
+        """
+        from .core import parse
+
+        commands = {}
+        for name, target in sorted(self.commands.items()):
+            if not isinstance(target, str):
+                continue
+
+            commands[name] = dict(
+                target=target, summary=_get_summary(parse(self.load(name))))
+
+        manifest = dict(commands=commands)
+        path = path or self.manifest
+        if path is not None:
+            with open(path, 'w') as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+
+        self._summaries = None
+        return manifest
+
+    def _get_summaries(self):
+        if self._summaries is not None:
+            return self._summaries
+
+        commands = {}
+        if self.manifest is not None:
+            try:
+                with open(self.manifest) as f:
+                    commands = json.load(f)['commands']
+            except (OSError, ValueError, KeyError):
+                pass
+
+        # Entries of changed targets are outdated.
+        self._summaries = {
+            name: entry['summary'] for name, entry in commands.items()
+            if self.commands.get(name) == entry.get('target')}
+
+        return self._summaries
+
+    def get_help(self, width=70, tabstop=16):
+        """List subcommands with their summaries without importing them."""
+        from ._doc import _get_one_argument_doc
+
+        summaries = self._get_summaries()
+        items = ['usage: {} COMMAND [ARGS...]'.format(
+                     self.prog or sys.argv[0]),
+                 '',
+                 'Commands:']
+
+        for name in sorted(self.commands):
+            summary = summaries.get(name)
+            if summary:
+                items.append(
+                    _get_one_argument_doc(name, summary, width, tabstop))
+            else:
+                items.append('  ' + name)
+
+        return '\n'.join(items)
+
+    def get_command_help(self, name, width=70, tabstop=16):
+        """Get the help of a subcommand.
+
+        The subcommand is imported only if its spec can't be extracted
+        statically.
+        """
+        from ._doc import get_normalized_docstring
+
+        target, spec = self.commands[name], None
+        if isinstance(target, str) and name not in self._loaded:
+            spec = _extract_target_spec(target)
+
+        if spec is None:
+            from .core import parse
+            spec = parse(self.load(name))
+
+        return get_normalized_docstring(spec, width=width, tabstop=tabstop)
+
+    def run(self, args=None, **options):
+        """Run the subcommand named by args[0] with the rest of args.
+
+        `--help` before a subcommand lists subcommands, and after a
+        subcommand shows its help. Options are passed to classarg.run.
+        """
+        from .core import run, ArgumentError
+
+        args = list(args if args is not None else sys.argv[1:])
+        if not args or args[0] in ('-h', '--help'):
+            print(self.get_help())
+            return None
+
+        name, args = args[0], args[1:]
+        if name not in self.commands:
+            raise ArgumentError("Unknown command '{}'".format(name))
+
+        if _asks_for_help(args):
+            print(self.get_command_help(name))
+            return None
+
+        return run(self.load(name), args=args, **options)
@@ -0,0 +1,343 @@
+"""Run each command in a forked child of a warm process.
+
+Commands which mutate globals can't share the process running them, but
+importing their modules for every invocation is slow. A ForkServer imports
+the targets and compiles their matchers once, then keeps a pool of
+children forked from that warm state by a single-threaded control
+process. Each invocation is sent to an idle child, which matches and runs
+it, reports its exit status and output, and exits. A new child is forked
+in its place, so every invocation starts from the same state. For instance,
+
+    with ForkServer({'build': 'tool.build:main'}, workers=4) as server:
+        status, stdout, stderr = server.execute(['build', 'x'])
+
+IsolatedServer serves a Unix socket like classarg.server.Server, but runs
+each request in a child.
+
+Only available on platforms with os.fork.
+"""
+import os
+import json
+import struct
+import signal
+import socket
+import threading
+import socketserver
+from array import array
+
+from .server import Server, preload, run_command
+
+__all__ = (
+    'ForkServer',
+    'IsolatedServer',
+)
+
+
+# Requests to the control process are (operation, pid) with an optional fd,
+# and answered by an integer, the pid of a new child or a wait status.
+_request = struct.Struct('!ii')
+_reply = struct.Struct('!i')
+_SPAWN, _WAIT, _KILL = range(3)
+
+
+class _Worker:
+    def __init__(self, pid, sock):
+        self.pid = pid
+        self.sock = sock
+        self.file = sock.makefile('rwb')
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+def _recv_exactly(sock, size, data=b''):
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+
+    return data
+
+
+def _send_request(sock, operation, pid=0, fd=None):
+    data = _request.pack(operation, pid)
+    if fd is None:
+        sock.sendall(data)
+        return
+
+    fds = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array('i', [fd]))]
+    sent = sock.sendmsg([data], fds)
+    sock.sendall(data[sent:])
+
+
+def _recv_request(sock):
+    """Return (operation, pid, fds), or None if the parent is gone."""
+    fds = array('i')
+    data, ancdata, _, _ = sock.recvmsg(
+        _request.size, socket.CMSG_SPACE(fds.itemsize))
+    if not data:
+        return None
+
+    for level, kind, cmsg_data in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(
+                cmsg_data[:len(cmsg_data) - len(cmsg_data) % fds.itemsize])
+
+    data = _recv_exactly(sock, _request.size, data)
+    if data is None:
+        return None
+
+    return _request.unpack(data) + (list(fds), )
+
+
+def _serve_one(dispatcher, sock):
+    """Run the request sent over sock in the child."""
+    with sock.makefile('rwb') as f:
+        line = f.readline()
+        if not line:  # closed by the parent
+            return
+
+        request = json.loads(line.decode('utf-8'))
+        status, stdout, stderr = run_command(
+            dispatcher, request['argv'], request.get('cwd'))
+        f.write(json.dumps(dict(
+            status=status, stdout=stdout, stderr=stderr)).encode('utf-8'))
+        f.write(b'\n')
+        f.flush()
+
+
+def _spawn_worker(dispatcher, control, fd):
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            # The control process holds no other sockets of ForkServer.
+            control.close()
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM, 0,
+                               fd) as sock:
+                _serve_one(dispatcher, sock)
+            status = 0
+        finally:
+            # Skip the cleanup of the parent, e.g. atexit handlers.
+            os._exit(status)
+
+    os.close(fd)
+    return pid
+
+
+def _serve_control(dispatcher, control):
+    """Fork workers for the parent until it closes control."""
+    while True:
+        request = _recv_request(control)
+        if request is None:
+            return
+
+        operation, pid, fds = request
+        if operation == _SPAWN:
+            reply = _spawn_worker(dispatcher, control, fds[0])
+        else:
+            if operation == _KILL:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            _, reply = os.waitpid(pid, 0)
+
+        control.sendall(_reply.pack(reply))
+
+
+def _get_exit_status(wait_status):
+    if os.WIFSIGNALED(wait_status):
+        return 128 + os.WTERMSIG(wait_status)
+    return os.WEXITSTATUS(wait_status)
+
+
+class ForkServer:
+    """Run commands in children forked from a warm process.
+
+    commands: dict from command names to targets like 'module:function',
+              or a Dispatcher.
+    workers:  the number of children forked in advance, which is also the
+              maximum number of commands running at once.
+    timeout:  seconds to wait for the result of a command, after which its
+              child is killed. None waits forever.
+
+    The control process is forked when it's created, and forks the
+    children on request, so execute can be called from multiple threads,
+    and the children don't inherit the sockets of other children or
+    clients. Create it before starting other threads.
+
+    Call close, or use it as a context manager, to stop the children.
+    """
+    def __init__(self, commands, *, workers=4, timeout=None):
+        from .dispatch import Dispatcher
+
+        if not hasattr(os, 'fork'):
+            raise NotImplementedError('ForkServer requires os.fork')
+        if workers < 1:
+            raise ValueError('workers should be at least 1')
+
+        if not isinstance(commands, Dispatcher):
+            commands = Dispatcher(commands)
+        self.dispatcher = commands
+        self.workers = workers
+        self.timeout = timeout
+
+        self._idle = []
+        self._lock = threading.Lock()
+        self._control_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers)
+        self._closed = False
+
+        preload(self.dispatcher)
+        self._control, control = socket.socketpair()
+        self._control_pid = os.fork()
+        if self._control_pid == 0:
+            status = 1
+            try:
+                self._control.close()
+                _serve_control(self.dispatcher, control)
+                status = 0
+            finally:
+                os._exit(status)
+
+        control.close()
+        for _ in range(workers):
+            self._idle.append(self._spawn())
+
+    def _call(self, operation, pid=0, fd=None):
+        with self._control_lock:
+            _send_request(self._control, operation, pid, fd)
+            data = _recv_exactly(self._control, _reply.size)
+
+        if data is None:
+            raise RuntimeError('The control process of ForkServer exited')
+
+        return _reply.unpack(data)[0]
+
+    def _spawn(self):
+        parent_sock, child_sock = socket.socketpair()
+        try:
+            pid = self._call(_SPAWN, fd=child_sock.fileno())
+        except BaseException:
+            parent_sock.close()
+            raise
+        finally:
+            child_sock.close()
+
+        return _Worker(pid, parent_sock)
+
+    def _take(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('ForkServer is closed')
+            if self._idle:
+                return self._idle.pop()
+
+        return self._spawn()
+
+    def _refill(self):
+        # close waits for running commands, so it can't race with this.
+        with self._lock:
+            if self._closed or len(self._idle) >= self.workers:
+                return
+
+        worker = self._spawn()
+        with self._lock:
+            self._idle.append(worker)
+
+    def _stop(self, worker):
+        worker.close()  # the child exits on EOF
+        self._call(_WAIT, worker.pid)
+
+    def execute(self, argv, cwd=None):
+        """Run argv in a child and return (status, stdout, stderr).
+
+        Block while all workers are busy.
+        """
+        with self._slots:
+            worker = self._take()
+            line, timed_out = b'', False
+            try:
+                worker.sock.settimeout(self.timeout)
+                worker.file.write(json.dumps(dict(
+                    argv=list(argv), cwd=cwd)).encode('utf-8') + b'\n')
+                worker.file.flush()
+                line = worker.file.readline()
+            except socket.timeout:
+                timed_out = True
+            finally:
+                worker.close()
+                wait_status = self._call(
+                    _KILL if timed_out else _WAIT, worker.pid)
+
+            self._refill()
+
+        if timed_out:
+            return _get_exit_status(wait_status), '', (
+                'error: worker {} timed out after {} seconds\n'.format(
+                    worker.pid, self.timeout))
+
+        if not line:
+            status = _get_exit_status(wait_status)
+            return status, '', 'error: worker {} exited with {}\n'.format(
+                worker.pid, status)
+
+        response = json.loads(line.decode('utf-8'))
+        return response['status'], response['stdout'], response['stderr']
+
+    def close(self):
+        """Stop the children and the control process.
+
+        Wait for running commands, which are not interrupted.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        for _ in range(self.workers):
+            self._slots.acquire()
+
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        for worker in idle:
+            self._stop(worker)
+
+        self._control.close()  # the control process exits on EOF
+        os.waitpid(self._control_pid, 0)
+
+        for _ in range(self.workers):
+            self._slots.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class IsolatedServer(socketserver.ThreadingMixIn, Server):
+    """Serve commands on the Unix socket at path, each in a forked child.
+
+    Requests are handled concurrently, up to `workers` at once, and
+    commands are killed after `timeout` seconds. See classarg.server.Server
+    and ForkServer.
+    """
+    daemon_threads = True
+
+    def __init__(self, path, commands, *, workers=4, timeout=None):
+        # Fork before binding the socket, so that children don't hold it.
+        self.forkserver = ForkServer(commands, workers=workers,
+                                     timeout=timeout)
+        super().__init__(path, self.forkserver.dispatcher)
+
+    def execute(self, argv, cwd=None):
+        return self.forkserver.execute(argv, cwd)
+
+    def server_close(self):
+        super().server_close()
+        self.forkserver.close()
@@ -0,0 +1,239 @@
+"""Serve commands over a Unix socket to skip interpreter startup.
+
+The server imports the target of each command and compiles its matcher
+once, then runs argv vectors sent by clients, so each invocation only pays
+for matching and the command itself. For instance,
+
+    python -m classarg.server /tmp/tool.sock build=tool.build:main &
+    python -m classarg.client /tmp/tool.sock build x --jobs=2
+
+Commands are dispatched like classarg.dispatch.Dispatcher, with argv[0]
+naming the command. Requests are handled one at a time in the server
+process, so commands share its globals, unless the server is isolated, see
+classarg.forkserver. The output of a command is sent
+back to the client with its exit status. Standard input and environment
+variables are not forwarded, but commands run in the working directory of
+the client.
+
+Each connection carries one request, a JSON line {"argv": [...], "cwd":
+...}, answered by a JSON line {"status": ..., "stdout": ..., "stderr":
+...}.
+"""
+import io
+import os
+import sys
+import json
+import stat
+import socket
+import socketserver
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+
+__all__ = (
+    'Server',
+    'preload',
+    'run_command',
+)
+
+
+def _get_status(ret):
+    # Like sys.exit, integers are used as the exit status.
+    if isinstance(ret, int) and not isinstance(ret, bool):
+        return ret
+    return 0
+
+
+def preload(dispatcher):
+    """Import the commands of dispatcher and compile their matchers."""
+    from .core import compile_matcher, _get_validator
+
+    for name in dispatcher.commands:
+        func = dispatcher.load(name)
+        compile_matcher(func)
+
+        rules = getattr(func, '_classarg_val', None)
+        if rules:
+            _get_validator(func, rules, None, {})
+
+
+def run_command(dispatcher, argv, cwd=None):
+    """Run argv with dispatcher in cwd and capture the output.
+
+    Return (status, stdout, stderr). Errors are reported like a CLI app:
+    ArgumentError gives status 2, and other exceptions give status 1 with
+    the traceback in stderr.
+    """
+    from .core import ArgumentError
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    old_cwd = os.getcwd() if cwd else None
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                if cwd:
+                    os.chdir(cwd)
+                status = _get_status(dispatcher.run(argv))
+            except ArgumentError as e:
+                print('error: {}'.format(e), file=sys.stderr)
+                status = 2
+            except SystemExit as e:
+                if e.code is None or isinstance(e.code, int):
+                    status = e.code or 0
+                else:
+                    print(e.code, file=sys.stderr)
+                    status = 1
+            except Exception:
+                traceback.print_exc()
+                status = 1
+    finally:
+        if old_cwd:
+            os.chdir(old_cwd)
+
+    return status, stdout.getvalue(), stderr.getvalue()
+
+
+def _remove_stale_socket(path):
+    """Remove the socket at path if no server is listening on it."""
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError('{} exists and is not a socket'.format(path))
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except ConnectionRefusedError:
+            os.remove(path)
+            return
+
+    raise FileExistsError('A server is listening on {}'.format(path))
+
+
+def _read_message(rfile):
+    line = rfile.readline()
+    if not line:
+        raise ValueError('Connection closed')
+
+    return json.loads(line.decode('utf-8'))
+
+
+def _write_message(wfile, message):
+    wfile.write(json.dumps(message).encode('utf-8') + b'\n')
+    wfile.flush()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = _read_message(self.rfile)
+            argv = [str(arg) for arg in request['argv']]
+        except (ValueError, KeyError, TypeError) as e:
+            _write_message(self.wfile, dict(
+                status=2, stdout='',
+                stderr='error: invalid request: {}\n'.format(e)))
+            return
+
+        status, stdout, stderr = self.server.execute(
+            argv, request.get('cwd'))
+        _write_message(self.wfile, dict(
+            status=status, stdout=stdout, stderr=stderr))
+
+
+class Server(socketserver.UnixStreamServer):
+    """Run commands sent to the Unix socket at path.
+
+    commands: dict from command names to targets like 'module:function',
+              or a Dispatcher.
+
+    Targets are imported and their matchers compiled when the server is
+    created. A stale socket at path is replaced, but FileExistsError is
+    raised if path is another file or a server is listening on it. The
+    socket is only accessible by the owner. Call serve_forever to serve,
+    and server_close to remove the socket.
+    """
+    def __init__(self, path, commands):
+        from .dispatch import Dispatcher
+
+        if not isinstance(commands, Dispatcher):
+            commands = Dispatcher(commands)
+        self.dispatcher = commands
+        self.path = path
+        self._bound = False
+        preload(self.dispatcher)
+
+        _remove_stale_socket(path)
+        super().__init__(path, _Handler)
+
+    def server_bind(self):
+        # Clients could connect between bind and chmod, so bind with a umask
+        # hiding the socket from others.
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+        self._bound = True
+        os.chmod(self.path, 0o600)
+
+    def execute(self, argv, cwd=None):
+        """Run argv and return (status, stdout, stderr)."""
+        return run_command(self.dispatcher, argv, cwd)
+
+    def server_close(self):
+        super().server_close()
+        if not self._bound:  # path may belong to another server
+            return
+
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def _parse_commands(specs):
+    commands = {}
+    for spec in specs:
+        name, sep, target = spec.partition('=')
+        if not sep or not name or not target:
+            raise ValueError(
+                "Command '{}' should be like NAME=MODULE:FUNCTION".format(
+                    spec))
+        commands[name] = target
+
+    return commands
+
+
+def main(socket, *commands, isolated=False, workers: int = 4,
+         timeout: float = None):
+    """Serve commands on a Unix socket until interrupted.
+
+    socket:   the path of the Unix socket.
+    commands: the commands like NAME=MODULE:FUNCTION.
+    isolated: run each command in a child forked from the server.
+    workers:  the number of children forked in advance if isolated.
+    timeout:  seconds before killing a command if isolated.
+    """
+    if isolated:
+        from .forkserver import IsolatedServer
+        server = IsolatedServer(socket, _parse_commands(commands),
+                                workers=workers, timeout=timeout)
+    else:
+        server = Server(socket, _parse_commands(commands))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    from .core import run
+    sys.exit(run(main))
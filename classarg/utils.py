@@ -4,3 +4,22 @@ import sys
 def compatible_with(major, minor=0, micro=0):
     info = sys.version_info
     return (info.major, info.minor, info.micro) >= (major, minor, micro)
+
+
+def load_module(path, name='target_module'):
+    """Import the source file at path as a module."""
+    import importlib.util  # load module on demand
+
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module
+
+
+def get_qualified_attr(obj, qualname):
+    """Get attributes like 'Class.method' from obj."""
+    for name in qualname.split('.'):
+        obj = getattr(obj, name)
+
+    return obj
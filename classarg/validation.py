@@ -1,40 +1,60 @@
 """This module defines validation rules that can be used as decorators to
 transparently validate input arguments.
 
-A rule always has the arguments `func` and `match`. For instance,
+A rule always has the keyword arguments `spec` and `matcher`, the dict from
+argument names to the matched values. For instance,
 ```
-def rule([rule-specific args and kwargs], func, match):
+def rule([rule-specific args and kwargs], spec, matcher):
     pass
 ```
 
+Rules are compiled once per function into a single validator. A rule can
+precompute what only depends on the spec by defining
+`rule.compile([rule-specific args and kwargs], spec)`, which returns a
+function of the matcher, optionally with a batch form, see
+classarg.validation_funcs.
+
+Rules can be async, i.e. coroutine functions, e.g. to look up remote
+resources. Functions with async rules are run on an event loop by
+classarg.run, see classarg.core.run_async.
+
 Call `validation.register` to add a custom rule. Please don't define rules
 with name starting with underscore.
 
+Rules can be registered and attached while other threads are validating.
+The registry and the rules of each function are immutable snapshots which
+are replaced as a whole, so readers never lock nor see partial updates.
+
 """
 
 import sys
+from threading import Lock
 from types import ModuleType
 from functools import wraps, partial
 
 
+# Serializes writers, so that concurrent updates aren't lost. Readers only
+# load the current snapshot.
+_write_lock = Lock()
+
+
 def _validation_rule(rule):
     """
     This function is used internally to wrap rule into a decorator factory at
     runtime.
 
     A decorator factory receives arguments and create a specific
-    decorator. The decorator will append the rule into the list
-    `main._classarg_val`.
+    decorator. The decorator will replace the tuple `main._classarg_val`
+    with a new one ending with the rule.
     """
     @wraps(rule)
     def decorator_factory(*args, **kwargs):
         bound_rule = partial(rule, *args, **kwargs)
 
         def decorator(main):
-            try:
-                main._classarg_val.append(bound_rule)
-            except AttributeError:
-                setattr(main, '_classarg_val', [bound_rule])
+            with _write_lock:
+                rules = tuple(getattr(main, '_classarg_val', ()))
+                main._classarg_val = rules + (bound_rule, )
 
             return main
 
@@ -47,22 +67,37 @@ class ValidationModule(ModuleType):
     def __init__(self):
         super().__init__(__name__, __doc__)
 
+        # Never mutated. Writers replace it with an updated copy.
         self._rules = {}
 
     def register(self, name, rule):
-        self._rules[name] = _validation_rule(rule)
+        decorator_factory = _validation_rule(rule)
+        with _write_lock:
+            rules = dict(self._rules)
+            rules[name] = decorator_factory
+            self._rules = rules
 
     def _internal_register(self, name, rule):
         setattr(self, name, _validation_rule(rule))
 
     def unregister(self, name):
-        del self._rules[name]
+        with _write_lock:
+            rules = dict(self._rules)
+            del rules[name]
+            self._rules = rules
 
     def __getattr__(self, name):
-        if name not in self._rules:
-            raise ValueError("Rule '{0}' is not registered.".format(name))
+        if name in _support_funcs:
+            # Built-in rules are loaded on first use.
+            import classarg.validation_funcs as val_funcs
+            self._internal_register(name, getattr(val_funcs, name))
+            return getattr(self, name)
 
-        return self._rules[name]
+        try:
+            return self._rules[name]
+        except KeyError:
+            raise ValueError(
+                "Rule '{0}' is not registered.".format(name)) from None
 
 
 module = ValidationModule()
@@ -72,10 +107,5 @@ _support_funcs = (
     'at_least',
 )
 
-import classarg.validation_funcs as val_funcs # noqa
-for func_name in _support_funcs:
-    module._internal_register(
-        func_name, getattr(val_funcs, func_name))
-
 
 sys.modules[__name__] = module
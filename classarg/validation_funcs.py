@@ -1,35 +1,225 @@
-def _collect_bool_args(spec, matcher):
-    bool_args = set()
-    for name, value in matcher.items():
-        if isinstance(value, bool):
-            bool_args.add(name)
+"""Validation rules.
 
-    return bool_args
+Each rule can define `rule.compile(*args, spec, **kwargs)`, which returns a
+function validating a matcher. It's called once per spec, so the function
+should only look at the flags given to the rule rather than the whole
+matcher.
 
+The compiled function can have a `batch` attribute, which validates a
+list of matchers of the same spec. It returns the list of errors of each
+matcher, None for valid ones. Batch functions check the matchers column by
+column, i.e. one flag of all matchers at a time.
+"""
 
-def at_least(*flag_names, spec, matcher):
-    bool_args = _collect_bool_args(spec, matcher)
 
+def _compiled_by(compile_rule):
+    """Attach compile to the decorated rule.
+
+    compile_rule(*args, spec, **kwargs) returns (check, check_many), which
+    are compiled together, and check_many is attached to check as batch.
+    """
+    def compile(*args, spec, **kwargs):
+        check, check_many = compile_rule(*args, spec=spec, **kwargs)
+        check.batch = check_many
+        return check
+
+    def decorator(rule):
+        rule.compile = compile
+        return rule
+
+    return decorator
+
+
+def _flag_not_found(flag):
+    return KeyError("Flag '{0}' not found in spec or input".format(flag))
+
+
+def _flag_not_bool(flag, value):
+    return TypeError(("Expect '{0}' to be boolean type"
+                      "but receive {1} instead.").format(flag, type(value)))
+
+
+def _get_flag_values(flag_names, matcher):
+    values = []
+    for flag in flag_names:
+        try:
+            value = matcher[flag]
+        except KeyError:
+            raise _flag_not_found(flag)
+
+        if not isinstance(value, bool):
+            raise _flag_not_bool(flag, value)
+        values.append(value)
+
+    return values
+
+
+def _get_flag_columns(flag_names, matchers, errors):
+    """Get the values of each flag in matchers.
+
+    Errors of missing or non-boolean flags are set in errors, unless the
+    matcher already has one.
+    """
+    columns = []
     for flag in flag_names:
-        if flag not in matcher:
-            raise KeyError(
-                "Flag '{0}' not found in spec or input".format(flag))
+        column = []
+        for i, matcher in enumerate(matchers):
+            value = matcher.get(flag, False)
+            if errors[i] is None:
+                if flag not in matcher:
+                    errors[i] = _flag_not_found(flag)
+                elif not isinstance(value, bool):
+                    errors[i] = _flag_not_bool(flag, value)
+            column.append(value is True)
+        columns.append(column)
+
+    return columns
+
+
+def _compile_flag_count_rule(flag_names, is_valid, make_error):
+    def check(matcher):
+        if not is_valid(sum(_get_flag_values(flag_names, matcher))):
+            raise make_error()
+
+    def check_many(matchers):
+        errors = [None] * len(matchers)
+        columns = _get_flag_columns(flag_names, matchers, errors)
+        counts = [sum(row) for row in zip(*columns)]
+        for i, count in enumerate(counts):
+            if errors[i] is None and not is_valid(count):
+                errors[i] = make_error()
+
+        return errors
 
-        if flag not in bool_args:
-            raise TypeError(("Expect '{0}' to be boolean type"
-                             "but receive {1} instead.").format(
-                                 flag, type(matcher[flag])))
+    return check, check_many
 
-    if all(matcher[flag] is False for flag in flag_names):
-        raise ValueError(
+
+def _compile_at_least(*flag_names, spec):
+    def make_error():
+        return ValueError(
             "At least one of the following flags"
             "should be set to True: {}".format(flag_names))
 
+    return _compile_flag_count_rule(
+        flag_names, lambda count: count >= 1, make_error)
+
+
+@_compiled_by(_compile_at_least)
+def at_least(*flag_names, spec, matcher):
+    at_least.compile(*flag_names, spec=spec)(matcher)
+
+
+def _compile_one_of(*flag_names, spec):
+    def make_error():
+        return ValueError(
+            "Exactly one of the following flags"
+            "should be set to True: {}".format(flag_names))
 
+    return _compile_flag_count_rule(
+        flag_names, lambda count: count == 1, make_error)
+
+
+@_compiled_by(_compile_one_of)
 def one_of(*flag_names, spec, matcher):
-    pass
+    one_of.compile(*flag_names, spec=spec)(matcher)
+
+
+def _compile_type_check(obj):
+    """Compile a normalized type into a predicate of values."""
+    from ._typing import NoneType, Union, List, Set, Tuple
+
+    origin = getattr(obj, '__origin__', None)
+    if obj is int:
+        return lambda v: isinstance(v, int) and not isinstance(v, bool)
+    elif obj is float:
+        return lambda v: (isinstance(v, (int, float)) and
+                          not isinstance(v, bool))
+    elif obj in (bool, str, NoneType):
+        return lambda v: isinstance(v, obj)
+
+    elif origin is Union:
+        checks = tuple(_compile_type_check(t) for t in obj.__args__)
+        return lambda v: any(check(v) for check in checks)
+
+    elif origin in (List, Set):
+        container = list if origin is List else set
+        check = _compile_type_check(obj.__args__[0])
+        return lambda v: (isinstance(v, container) and
+                          all(check(item) for item in v))
+
+    elif origin is Tuple:
+        checks = tuple(_compile_type_check(t) for t in obj.__args__)
+        return lambda v: (isinstance(v, tuple) and len(v) == len(checks) and
+                          all(c(item) for c, item in zip(checks, v)))
+
+    return lambda v: True  # unknown types are not checked
+
+
+def _compile_value_check(name, annotation, spec, mode):
+    from .core import LazyArgs, _get_varargs_type
+
+    is_varargs = name == spec.varargs
+    if is_varargs:
+        annotation = _get_varargs_type(annotation)
+
+    check = _compile_type_check(annotation)
+    if mode == 'str':
+        check_type = check
+
+        def check(value):
+            return isinstance(value, str) or check_type(value)
 
+    if not is_varargs:
+        return check
 
+    def check_varargs(value):
+        # Lazy values are checked when they're consumed.
+        return (isinstance(value, LazyArgs) or
+                all(check(item) for item in value))
+
+    return check_varargs
+
+
+def _compile_enforce_type(mode, *, spec):
+    if mode not in ('error', 'str'):
+        raise ValueError("mode should be one of 'error', 'str'")
+
+    checks = [(name, annotation,
+               _compile_value_check(name, annotation, spec, mode))
+              for name, annotation in spec.annotations.items()
+              if name != 'return']
+
+    def make_error(name, annotation, value):
+        return TypeError("Expect '{}' to be {} but receive {!r}".format(
+            name, getattr(annotation, '__name__', annotation), value))
+
+    def check(matcher):
+        for name, annotation, check_value in checks:
+            if name in matcher and not check_value(matcher[name]):
+                raise make_error(name, annotation, matcher[name])
+
+    def check_many(matchers):
+        errors = [None] * len(matchers)
+        for name, annotation, check_value in checks:
+            for i, matcher in enumerate(matchers):
+                if errors[i] is not None or name not in matcher:
+                    continue
+
+                value = matcher[name]
+                if not check_value(value):
+                    errors[i] = make_error(name, annotation, value)
+
+        return errors
+
+    return check, check_many
+
+
+@_compiled_by(_compile_enforce_type)
 def enforce_type(mode, *, spec, matcher):
-    """mode: one of 'error', 'str'"""
-    pass
+    """Check that matched values agree with the type hints of the spec.
+
+    mode: one of 'error', 'str'. With 'error', values of other types raise
+          TypeError. With 'str', strings are accepted as well, e.g. values
+          given to **kwargs.
+    """
+    enforce_type.compile(mode, spec=spec)(matcher)
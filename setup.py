@@ -15,7 +15,7 @@ setuptools.setup(
     description='A library for easily creating CLI applications.',
     long_description=long_description,
     url='https://github.com/IanChen83/ClassArg',
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=('tests', 'benchmarks')),
     classifiers=(
         'Development Status :: 1 - Planning',
         'Environment :: Console',
@@ -0,0 +1,4 @@
+import sys
+
+# Async functions are syntax errors before python 3.5.
+collect_ignore = ['test_async.py'] if sys.version_info < (3, 5) else []
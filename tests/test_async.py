@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+import classarg.core as core
+import classarg.validation as validation
+from classarg.utils import compatible_with
+
+# asyncio.run is added in python 3.7
+requires_asyncio_run = pytest.mark.skipif(
+    not compatible_with(3, 7), reason='requires asyncio.run')
+
+
+async def _positive(name, *, spec, matcher):
+    await asyncio.sleep(0)
+    if matcher[name] <= 0:
+        raise ValueError(name)
+
+
+def test_run_async_function():
+    async def func(a: int, *, b: int = 1):
+        await asyncio.sleep(0)
+        return a + b
+
+    # run drives the coroutine when no loop is running
+    assert core.run(func, args=['1', '--b=2']) == 3
+
+    with pytest.raises(core.ArgumentError):
+        core.run(func, args=[])
+
+
+def test_run_async_call():
+    class X:
+        async def __call__(self, a: int):
+            return a * 2
+
+    assert core.run(X(), args=['2']) == 4
+
+
+@requires_asyncio_run
+def test_run_in_loop():
+    async def func(a: int):
+        await asyncio.sleep(0)
+        return a
+
+    async def main():
+        # inside a running loop, run returns an awaitable
+        pending = [core.run(func, args=[str(i)]) for i in range(10)]
+        assert all(asyncio.iscoroutine(p) for p in pending)
+        results = await asyncio.gather(*pending)
+
+        # sync functions still run synchronously
+        assert core.run(lambda a: a, args=['x']) == 'x'
+        return results
+
+    assert asyncio.run(main()) == list(range(10))
+
+
+@requires_asyncio_run
+def test_async_rules():
+    validation.register('positive', _positive)
+    try:
+        @validation.positive('a')
+        @validation.at_least('b')
+        def func(a: int, *, b=False):
+            return a
+
+        assert core.run(func, args=['1', '-b']) == 1
+        with pytest.raises(ValueError):
+            core.run(func, args=['0', '-b'])
+        with pytest.raises(ValueError):
+            core.run(func, args=['1'])
+
+        # sync validation can't await async rules
+        with pytest.raises(TypeError):
+            core.validate(func, dict(a=1, b=True))
+        with pytest.raises(TypeError, match='in batches'):
+            core.validate_many(func, [dict(a=1, b=True)])
+
+        # match_many fails before matching any argv
+        consumed = []
+
+        def argvs():
+            consumed.append(True)
+            yield ['1', '-b']
+
+        with pytest.raises(TypeError, match='match_many'):
+            list(core.match_many(func, argvs()))
+        assert not consumed
+        assert list(core.match_many(func, argvs(), check=False)) == [
+            ([1], dict(b=True))]
+
+        asyncio.run(core.validate_async(func, dict(a=1, b=True)))
+        with pytest.raises(ValueError):
+            asyncio.run(core.validate_async(func, dict(a=-1, b=True)))
+    finally:
+        validation.unregister('positive')
@@ -0,0 +1,74 @@
+import sys
+import json
+import subprocess
+
+import classarg.bulk as bulk
+
+
+def _write(tmp_path, name, source):
+    path = tmp_path / name
+    path.write_text(source)
+    return str(path)
+
+
+def test_extract_many(tmp_path):
+    good = _write(tmp_path, 'good.py', (
+        'import sys\n'
+        'sys.modules["bulk_side_effect"] = sys\n'
+        'def main(a, *, b: int = 1):\n'
+        '    """Run.\n\n    b:  the b.\n    """\n'))
+    other = _write(tmp_path, 'other.py', (
+        'import sys\n'
+        'assert "bulk_side_effect" not in sys.modules\n'
+        'def main(c=False): pass\n'))
+    broken = _write(tmp_path, 'broken.py', 'raise RuntimeError("boom")\n')
+    slow = _write(tmp_path, 'slow.py', 'import time\ntime.sleep(10)\n')
+    crash = _write(tmp_path, 'crash.py', 'import os\nos._exit(3)\n')
+    swallow = _write(tmp_path, 'swallow.py', (
+        'import time\n'
+        'try:\n    time.sleep(10)\nexcept Exception:\n    pass\n'))
+    unpicklable = _write(tmp_path, 'unpicklable.py',
+                         'def main(a=lambda: 1, *, b=(1, 2)): pass\n')
+
+    results = {r['path']: r for r in bulk.extract_many(
+        [good, crash, other, broken, slow, swallow, unpicklable], workers=2,
+        timeout=1)}
+
+    assert results[good]['spec']['args'] == ['a']
+    assert results[good]['spec']['annotations'] == dict(b='int')
+    assert results[good]['spec']['argument_docs'] == dict(b='the b.')
+    assert '  -b            the b.' in results[good]['help']
+    assert results[other]['spec']['args'] == ['c']
+    assert results[broken]['error'] == 'RuntimeError: boom'
+    assert results[slow]['error'].startswith('Timeout')
+    assert results[swallow]['error'].startswith('Timeout')
+    assert results[crash]['error'] == 'Worker process exited unexpectedly'
+    assert results[unpicklable]['spec']['defaults'][0].startswith(
+        '<function <lambda>')
+    assert results[unpicklable]['spec']['kwonlydefaults'] == dict(b=(1, 2))
+
+
+def test_extract_many_annotations(tmp_path):
+    path = _write(tmp_path, 'typed.py', (
+        'from typing import List, Optional, Tuple\n'
+        'def main(a: List[int], b: Optional[Tuple[int, str]] = None,\n'
+        '         c=(1, 2.5), d: str = ""): pass\n'))
+
+    result, = bulk.extract_many([path], workers=1)
+    assert result['spec']['annotations'] == dict(
+        a='typing.List[int]', b='typing.Optional[typing.Tuple[int, str]]',
+        c='typing.Tuple[int, float]', d='str')
+
+
+def test_main(tmp_path):
+    path = _write(tmp_path, 'tool.py', 'def main(a): pass\n')
+    paths = _write(tmp_path, 'paths.txt', path + '\n')
+
+    result = subprocess.run(
+        (sys.executable, '-m', 'classarg.bulk', '--static', '-j', '1',
+         '@' + paths),
+        stdout=subprocess.PIPE, universal_newlines=True, check=True)
+    result = json.loads(result.stdout)
+
+    assert result['static'] is True
+    assert result['spec']['args'] == ['a']
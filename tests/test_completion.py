@@ -0,0 +1,64 @@
+import pytest
+
+import classarg.completion as completion
+import classarg.utils as utils
+
+
+SOURCE = '''
+def main(path, *, verbose=False, dry_run=False, level: int = 1):
+    """Run the tool.
+
+    path:     the input path.
+    verbose:  print more
+              messages.
+    level:    the level.
+    -v:       --verbose
+    """
+'''
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'tool.py'
+    path.write_text(SOURCE)
+    return str(path)
+
+
+def test_build_index(source):
+    index = completion.get_index(source)
+
+    assert index['switches'] == [
+        '--dry-run', '--dry_run', '--level', '--path', '--verbose', '-v']
+    assert completion.complete(index, '--v') == [('--verbose', 'print more')]
+    assert completion.complete(index, '--d') == [
+        ('--dry-run', ''), ('--dry_run', '')]
+    assert completion.complete(index, '--x') == []
+    assert len(completion.complete(index, '')) == 6
+
+
+def test_persisted_index(source, monkeypatch):
+    index = completion.get_index(source)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('the module should not be imported')
+
+    with monkeypatch.context() as m:
+        m.setattr(utils, 'load_module', fail)
+        assert completion.get_index(source) == index
+
+    with open(source, 'a') as f:
+        f.write('\n\ndef other(*, flag=False): pass\n')
+
+    assert completion.get_index(source, 'other')['switches'] == ['--flag']
+    assert completion.get_index(source) == dict(
+        index, stamp=completion.get_index(source)['stamp'])
+
+
+def test_main(source, capsys):
+    assert completion.main([source, '--l']) == 0
+    assert capsys.readouterr().out == '--level\n'
+
+    assert completion.main(['--describe', '--', source, '-']) == 0
+    assert capsys.readouterr().out.splitlines()[-1] == '-v\tprint more'
+
+    assert completion.main([]) == 2
@@ -1,3 +1,4 @@
+import sys
 from types import SimpleNamespace
 
 import pytest
@@ -106,3 +107,277 @@ def test_parse_argv(args, expect):
 
     else:
         assert core._parse_one_arg(args) == expect
+
+
+def test_parse_cache():
+    def func(a, b=1, *, c: int): pass
+
+    spec = core.parse(func)
+    assert core.parse(func) is spec
+    assert core.parse(func, cache=False) is not spec
+    assert core.parse(func, cache=False) == spec
+
+    # fingerprint changes invalidate the cached spec
+    func.__defaults__ = (2, )
+    assert core.parse(func) is not spec
+    assert core.parse(func).defaults == (2, )
+
+    spec = core.parse(func)
+    core.clear_cache(func)
+    assert core.parse(func) is not spec
+
+    spec = core.parse(func)
+    core.clear_cache()
+    assert core.parse(func) is not spec
+
+
+def test_parse_cache_lru():
+    def make_func():
+        def func(a): pass
+        return func
+
+    maxsize = core._spec_cache.maxsize
+    funcs = [make_func() for _ in range(maxsize + 1)]
+    for func in funcs:
+        core.parse(func)
+
+    assert len(core._spec_cache) <= maxsize
+    assert (funcs[0], False) not in core._spec_cache
+    assert (funcs[-1], False) in core._spec_cache
+
+
+def test_parse_persist(tmp_path, monkeypatch):
+    import importlib.util
+
+    source = tmp_path / 'tool.py'
+    source.write_text('def main(a, b: int = 1):\n'
+                      '    """Run the tool.\n\n    a:  the input\n    """\n')
+
+    def load():
+        module_spec = importlib.util.spec_from_file_location(
+            'tool', str(source))
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+        return module.main
+
+    main = load()
+    spec = core.parse(main, cache=False, persist=True)
+    assert list((tmp_path / '__pycache__').glob('tool.main-function.*'))
+
+    # the persisted spec is used without parsing the function again
+    def fail(*args):
+        raise AssertionError('spec should be loaded from disk')
+
+    with monkeypatch.context() as m:
+        m.setattr(core, '_parse', fail)
+        assert core.parse(load(), cache=False, persist=True) == spec
+
+    # changes in the source invalidate the persisted spec
+    source.write_text('def main(a, b: int = 1, c=2):\n    pass\n')
+    spec = core.parse(load(), cache=False, persist=True)
+    assert spec.args == ('a', 'b', 'c')
+
+
+def test_parse_persist_across_processes(tmp_path):
+    import os
+    import subprocess
+
+    source = tmp_path / 'tool.py'
+    source.write_text(
+        'from typing import List, Tuple, Union\n\n'
+        'def main(a: List[int], *, b: Tuple[int, float] = (0, 0.0),\n'
+        '         c: Union[str, int] = 0):\n'
+        '    return a, b, c\n')
+
+    code = (
+        'import classarg.core as core\n'
+        'from classarg.utils import load_module\n'
+        'main = load_module({!r}).main\n'
+        'print(repr(core.run(main, args=["1,2", "--b=3,4.5"], persist=True)))'
+        '\n'.format(str(source)))
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+
+    # the second process loads the spec persisted by the first one
+    outputs = [subprocess.run(
+        (sys.executable, '-c', code), env=env, check=True,
+        stdout=subprocess.PIPE, universal_newlines=True).stdout
+        for _ in range(2)]
+    assert list((tmp_path / '__pycache__').glob('tool.main-function.*'))
+    assert outputs == ["([1, 2], (3, 4.5), 0)\n"] * 2
+
+
+def test_parse_persist_inherited_init(tmp_path, monkeypatch):
+    import importlib
+
+    (tmp_path / 'persist_base.py').write_text(
+        'class Base:\n    def __init__(self, x: int = 1):\n        pass\n')
+    for name in ('persist_a', 'persist_b'):
+        (tmp_path / (name + '.py')).write_text(
+            'from persist_base import Base\n\n'
+            'class Tool(Base):\n    """{}\n\n    x:  the x\n    """\n'
+            .format(name))
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    names = ('persist_base', 'persist_a', 'persist_b')
+    try:
+        a, b = (importlib.import_module(name) for name in names[1:])
+
+        # subclasses inheriting __init__ don't share a persisted spec
+        spec_a = core.parse(a.Tool, cache=False, persist=True)
+        spec_b = core.parse(b.Tool, cache=False, persist=True)
+        assert spec_a != spec_b
+        assert core.parse(a.Tool, cache=False, persist=True) == spec_a
+        assert list((tmp_path / '__pycache__').glob('persist_a.Tool-class.*'))
+
+        # changes in either the subclass or the base invalidate the spec
+        (tmp_path / 'persist_a.py').write_text(
+            'from persist_base import Base\n\n'
+            'class Tool(Base):\n    """changed"""\n')
+        a = importlib.reload(a)
+        assert core.parse(a.Tool, cache=False, persist=True) != spec_a
+
+        (tmp_path / 'persist_base.py').write_text(
+            'class Base:\n    def __init__(self, x: int = 1, y=2):\n'
+            '        pass\n')
+        importlib.reload(sys.modules['persist_base'])
+        b = importlib.reload(b)
+        spec = core.parse(b.Tool, cache=False, persist=True)
+        assert spec.args == ('x', 'y')
+    finally:
+        for name in names:
+            sys.modules.pop(name, None)
+
+
+def _gen_match_testcase():
+    def func(a, b: int = 1, *c: float, d: str, verbose=False, **e):
+        """
+        -v:  --verbose
+        -x:  --extra
+        """
+
+    yield func, ['x', '--d=1'], (['x', 1], dict(d='1', verbose=False))
+    yield func, ['x', '2', '3', '-1', '--d', 'y'], \
+        (['x', 2, 3.0, -1.0], dict(d='y', verbose=False))
+    yield func, ['--b=3', 'x', '-v', '--d=', '--', '-2'], \
+        (['x', 3, -2.0], dict(d='', verbose=True))
+    yield func, ['x', '--d=y', '--verbose=no', '--other', '-x=1'], \
+        (['x', 1], dict(d='y', verbose=False, other=True, extra='1'))
+    yield func, ['x', '--d'], core.ArgumentError()
+    yield func, ['x'], core.ArgumentError()
+    yield func, ['x', 'y', '--d=1'], core.ArgumentError()
+    yield func, ['x', '--d=1', '--2d'], core.ArgumentError()
+
+    def func2(dry_run=False, retry_times=1): pass
+
+    yield func2, ['--dry-run', '--retry-times', '3'], \
+        ([True, 3], dict())
+    yield func2, ['--retry_times=3', '1'], ([True, 3], dict())
+    yield func2, ['--retry_times=3', '1', '2'], core.ArgumentError()
+    yield func2, ['--unknown'], core.ArgumentError()
+
+
+@pytest.mark.parametrize('func, args, expect', list(_gen_match_testcase()))
+def test_match(func, args, expect):
+    if isinstance(expect, Exception):
+        with pytest.raises(Exception) as e_info:
+            ret = core.match(func, args=args)
+            print(ret)  # only print if not raising error
+
+        assert isinstance(expect, e_info.type)
+
+    else:
+        assert core.match(func, args=args) == expect
+
+
+def test_compile_matcher():
+    def func(a, *, b=1): pass
+
+    matcher = core.compile_matcher(func)
+    assert core.compile_matcher(func) is matcher
+    assert core.compile_matcher(matcher) is matcher
+    assert core.match(matcher, args=['x', '--b=2']) == (['x'], dict(b=2))
+
+
+def test_run():
+    def func(a, *b: int, c=False):
+        return a, b, c
+
+    assert core.run(func, args=['x', '1', '2', '-c']) == ('x', (1, 2), True)
+
+
+def test_match_many():
+    def func(a, *, b: int = 1): pass
+
+    argvs = [['x'], ['x', '--b=2'], ['x', '--b=y'], []]
+    expect = [(['x'], dict(b=1)), (['x'], dict(b=2))]
+
+    results = list(core.match_many(func, argvs, collect_errors=True))
+    assert results[:2] == expect
+    assert all(isinstance(e, core.ArgumentError) for e in results[2:])
+
+    results = core.match_many(func, argvs)
+    assert [next(results), next(results)] == expect
+    with pytest.raises(core.ArgumentError):
+        next(results)
+
+
+def test_iter_args(tmp_path, monkeypatch):
+    import io
+
+    nested = tmp_path / 'nested.txt'
+    nested.write_text('3\n\n4\n')
+    argfile = tmp_path / 'args.txt'
+    argfile.write_text('1\n@{}\n2\n'.format(nested))
+    monkeypatch.setattr('sys.stdin', io.StringIO('5\n6\n'))
+
+    args = core.iter_args(['0', '@' + str(argfile), '@-', '@'])
+    assert list(args) == ['0', '1', '3', '4', '2', '5', '6', '@']
+
+    with pytest.raises(core.ArgumentError):
+        list(core.iter_args(['@' + str(tmp_path / 'missing.txt')]))
+
+
+def test_match_lazy_varargs(tmp_path):
+    def func(a, *b: int, c=False): pass
+
+    argfile = tmp_path / 'args.txt'
+    argfile.write_text('\n'.join(str(i) for i in range(1000)))
+
+    args, kwargs = core.match(func, args=['-c', 'x', '@' + str(argfile)],
+                              fromfile_prefix='@', lazy_varargs=True)
+    assert args[0] == 'x' and kwargs == dict(c=True)
+    assert len(args) == 2 and sum(args[1]) == sum(range(1000))
+
+    args, _ = core.match(func, args=['x'], lazy_varargs=True)
+    assert list(args[1]) == []
+
+    args, _ = core.match(func, args=['x', '1', '-2', '--', '-c'],
+                         lazy_varargs=True)
+    with pytest.raises(core.ArgumentError):
+        list(args[1])
+
+    args, _ = core.match(func, args=['x', '1', '-c'], lazy_varargs=True)
+    with pytest.raises(core.ArgumentError):
+        list(args[1])
+
+
+def test_lazy_args():
+    from classarg._typing import List
+
+    def func(*a: List[int]): pass
+
+    args, _ = core.match(func, args=['1', '2'])
+    assert args == [1, 2]
+
+    args, _ = core.match(func, args=['1', '2', 'x'], lazy_varargs=True)
+    lazy = args[0]
+    assert isinstance(lazy, core.LazyArgs)
+    assert lazy.type is int
+
+    assert next(lazy) == 1 and lazy.consumed == 1
+    assert next(lazy) == 2
+    with pytest.raises(core.ArgumentError) as e_info:
+        next(lazy)
+    assert 'position 2' in str(e_info.value)
+    assert list(lazy) == []
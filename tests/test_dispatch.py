@@ -0,0 +1,84 @@
+import sys
+import json
+
+import pytest
+
+import classarg.core as core
+from classarg.dispatch import Dispatcher
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    root = tmp_path / 'dispatch_pkg'
+    root.mkdir()
+    (root / '__init__.py').write_text('')
+    (root / 'build.py').write_text(
+        'def main(target, *, jobs: int = 1):\n'
+        '    """Build the target with a very long summary line which\n'
+        '    continues here.\n\n'
+        '    jobs:  the number of jobs.\n'
+        '    """\n'
+        '    return target, jobs\n')
+    (root / 'clean.py').write_text(
+        'class Clean:\n'
+        '    def __init__(self, force=False):\n'
+        '        self.force = force\n')
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield Dispatcher({
+        'build': 'dispatch_pkg.build:main',
+        'clean': 'dispatch_pkg.clean:Clean',
+    }, manifest=str(tmp_path / 'manifest.json'), prog='tool')
+
+    for name in list(sys.modules):
+        if name.startswith('dispatch_pkg'):
+            del sys.modules[name]
+
+
+def test_run_loads_selected_command(package):
+    assert package.run(['build', 'x', '--jobs=2']) == ('x', 2)
+    assert 'dispatch_pkg.build' in sys.modules
+    assert 'dispatch_pkg.clean' not in sys.modules
+
+    assert package.run(['clean', '--force']).force is True
+
+    with pytest.raises(core.ArgumentError):
+        package.run(['unknown'])
+
+
+def test_help_from_manifest(package, capsys):
+    package.run(['--help'])
+    assert capsys.readouterr().out.splitlines()[-2:] == ['  build', '  clean']
+
+    package.build_manifest()
+    del sys.modules['dispatch_pkg.build']
+    del sys.modules['dispatch_pkg.clean']
+
+    fresh = Dispatcher(package.commands, manifest=package.manifest,
+                       prog='tool')
+    fresh.run([])
+    assert capsys.readouterr().out == (
+        'usage: tool COMMAND [ARGS...]\n'
+        '\n'
+        'Commands:\n'
+        '  build         Build the target with a very long summary line\n'
+        '                which\n'
+        '  clean\n')
+    assert 'dispatch_pkg.build' not in sys.modules
+
+    # outdated entries are ignored
+    commands = dict(package.commands, build='dispatch_pkg.clean:Clean')
+    fresh = Dispatcher(commands, manifest=package.manifest)
+    assert 'Build' not in fresh.get_help()
+
+    with open(package.manifest) as f:
+        assert set(json.load(f)['commands']) == {'build', 'clean'}
+
+
+def test_command_help(package, capsys):
+    package.run(['build', '--help'])
+    out = capsys.readouterr().out
+    assert '--jobs' in out and 'the number of jobs.' in out
+    assert 'dispatch_pkg.build' not in sys.modules
+
+    assert package.run(['build', '--', '--help']) == ('--help', 1)
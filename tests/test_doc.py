@@ -240,3 +240,42 @@ Arguments:
         print(res)
         print(expect8)
         assert res == expect8
+
+
+def test_load_doc_hints_many_flags():
+    spec = SimpleNamespace(
+        args=[], varargs=None, varkw='kwargs', defaults=tuple(),
+        kwonlyargs=tuple(), kwonlydefaults={}, annotations={})
+
+    lines = ['Arguments:']
+    for i in range(2000):
+        lines.append('    flag{}:  Loren ipsum'.format(i))
+        lines.append('             dolor sit amet.')
+        lines.append('    -f{}:    --flag{}'.format(i, i))
+
+    doc.load_doc_hints(spec, '\n'.join(lines))
+
+    assert spec.kwonlyargs == ['flag{}'.format(i) for i in range(2000)]
+    assert spec.argument_docs['flag1999'] == 'Loren ipsum\ndolor sit amet.'
+    assert spec.aliases['f1999'] == 'flag1999'
+    assert spec.annotations['flag0'] is bool
+
+
+def test_get_normalized_docstring_cache():
+    spec = SimpleNamespace(
+        args=['aaa'], varargs=None, varkw='fff', defaults=tuple(),
+        kwonlyargs=['ddd'], kwonlydefaults={}, annotations={})
+    doc.load_doc_hints(spec, """
+        aaa:  Loren ipsum dolor sit amet.
+        ddd:  Loren ipsum dolor sit amet.
+        -d:   --ddd
+        --dd: --ddd
+        """)
+
+    assert spec.alias_groups == dict(ddd=['--dd', '-d'])
+
+    res = doc.get_normalized_docstring(spec)
+    assert doc.get_normalized_docstring(spec) is res
+    assert doc.get_normalized_docstring(spec, width=40) is not res
+    assert res.endswith('  --ddd, --dd, -d\n'
+                        '                Loren ipsum dolor sit amet.')
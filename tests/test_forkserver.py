@@ -0,0 +1,144 @@
+import os
+import sys
+import stat
+import shutil
+import tempfile
+import threading
+
+import pytest
+
+import classarg.client as client
+from classarg.forkserver import ForkServer, IsolatedServer
+
+
+@pytest.fixture
+def commands(tmp_path, monkeypatch):
+    root = tmp_path / 'fork_pkg'
+    root.mkdir()
+    (root / '__init__.py').write_text('')
+    (root / 'tool.py').write_text(
+        'import os\n'
+        'import stat\n'
+        'import time\n\n'
+        'counter = 0\n\n'
+        'def count(step: int = 1):\n'
+        '    global counter\n'
+        '    counter += step\n'
+        '    print(counter)\n'
+        '    return counter\n\n'
+        'def pid():\n'
+        '    print(os.getpid())\n\n'
+        'def crash():\n'
+        '    os._exit(5)\n\n'
+        'def sleep(seconds: float):\n'
+        '    time.sleep(seconds)\n\n'
+        'def sockets():\n'
+        '    modes = []\n'
+        '    for fd in os.listdir("/dev/fd"):\n'
+        '        try:\n'
+        '            modes.append(os.fstat(int(fd)).st_mode)\n'
+        '        except OSError:\n'
+        '            pass\n'
+        '    print(sum(stat.S_ISSOCK(mode) for mode in modes))\n')
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield {name: 'fork_pkg.tool:' + name
+           for name in ('count', 'pid', 'crash', 'sleep', 'sockets')}
+
+    for name in list(sys.modules):
+        if name.startswith('fork_pkg'):
+            del sys.modules[name]
+
+
+def test_execute_isolated(commands):
+    with ForkServer(commands, workers=2) as server:
+        # targets are imported before forking
+        assert 'fork_pkg.tool' in sys.modules
+
+        # globals changed by a command don't leak into the next one
+        for _ in range(3):
+            assert server.execute(['count', '2']) == (2, '2\n', '')
+        assert sys.modules['fork_pkg.tool'].counter == 0
+
+        pids = {server.execute(['pid'])[1] for _ in range(3)}
+        assert len(pids) == 3 and str(os.getpid()) + '\n' not in pids
+
+        status, stdout, stderr = server.execute(['crash'])
+        assert status == 5 and 'exited with 5' in stderr
+
+        assert server.execute(['count', 'x'])[0] == 2
+        assert len(server._idle) == 2
+
+    assert server._idle == []
+    with pytest.raises(RuntimeError):
+        server.execute(['count'])
+
+
+def test_execute_concurrently(commands):
+    results = []
+
+    with ForkServer(commands, workers=2) as server:
+        def execute():
+            results.append(server.execute(['count']))
+
+        threads = [threading.Thread(target=execute) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert results == [(1, '1\n', '')] * 8
+
+
+def test_execute_timeout(commands):
+    with ForkServer(commands, workers=2, timeout=0.5) as server:
+        status, stdout, stderr = server.execute(['sleep', '10'])
+        assert status == 137 and 'timed out' in stderr
+
+        assert server.execute(['sleep', '0']) == (0, '', '')
+        assert len(server._idle) == 2
+
+
+def _count_sockets():
+    modes = []
+    for fd in os.listdir('/dev/fd'):
+        try:
+            modes.append(os.fstat(int(fd)).st_mode)
+        except OSError:
+            pass
+
+    return sum(stat.S_ISSOCK(mode) for mode in modes)
+
+
+def test_execute_closes_sockets(commands):
+    # sockets opened before the server are part of the warm state
+    inherited = _count_sockets()
+
+    with ForkServer(commands, workers=3) as server:
+        thread = threading.Thread(target=server.execute,
+                                  args=(['sleep', '1'], ))
+        thread.start()
+
+        # only the socket to the server, not those of other children
+        status, stdout, _ = server.execute(['sockets'])
+        assert (status, int(stdout)) == (0, inherited + 1)
+        thread.join()
+
+
+def test_isolated_server(commands):
+    directory = tempfile.mkdtemp()
+    server = IsolatedServer(os.path.join(directory, 'tool.sock'), commands,
+                            workers=2)
+    thread = threading.Thread(target=server.serve_forever,
+                              kwargs=dict(poll_interval=0.05))
+    thread.start()
+
+    try:
+        for _ in range(2):
+            response = client.call(server.path, ['count', '3'])
+            assert response == dict(status=3, stdout='3\n', stderr='')
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+        shutil.rmtree(directory)
@@ -0,0 +1,64 @@
+import os
+import sys
+import subprocess
+
+import classarg
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules which are slow to import, and only needed by some features.
+HEAVY_MODULES = ('typing', 'inspect', 'ast', 'asyncio', 'pickle', 'socket',
+                 'concurrent.futures', 'classarg.core', 'classarg._typing')
+
+
+def _run_python(*args):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run(
+        (sys.executable, ) + args, env=env, cwd=ROOT,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, check=True)
+
+
+def test_lazy_import():
+    result = _run_python('-c', (
+        'import sys, classarg\n'
+        'print(sorted(m for m in sys.modules if m.startswith("classarg")))'
+    ))
+    assert result.stdout.strip() == "['classarg', 'classarg.utils']"
+
+    result = _run_python('-c', (
+        'import sys, classarg\n'
+        'classarg.parse(lambda a: None)\n'
+        'print(sorted(m for m in sys.modules if m.startswith("classarg")))'
+    ))
+    assert 'classarg._doc' not in result.stdout
+    assert 'classarg.core' in result.stdout
+
+
+def test_import_heavy_modules():
+    # Modules imported by the interpreter itself, e.g. by site, don't count.
+    code = 'import sys\nprint(" ".join(sys.modules))'
+    before = set(_run_python('-c', code).stdout.split())
+    after = set(_run_python('-c', 'import classarg\n' + code).stdout.split())
+
+    assert not (after - before) & set(HEAVY_MODULES)
+
+
+def test_lazy_attributes():
+    from classarg import core
+
+    assert classarg.parse is core.parse
+    assert classarg.match_many is core.match_many
+    assert classarg(lambda a: a, args=['x']) == 'x'
+
+
+def test_all():
+    result = _run_python('-c', (
+        'import classarg\n'
+        'print(sorted(set(classarg.__all__) - set(dir(classarg))))\n'
+        'from classarg import *\n'
+        'print(Spec.__name__, Dispatcher.__name__, extract_spec.__name__)'))
+
+    assert result.stdout.split('\n')[:2] == [
+        '[]', 'Spec Dispatcher extract_spec']
@@ -0,0 +1,55 @@
+import pytest
+
+import classarg.__main__ as main
+
+
+SOURCE = '''
+import module_which_does_not_exist
+
+
+def main(path, *sizes: int, verbose=False, mode: 'str' = 'fast'):
+    """Run the tool.
+
+    -v:  --verbose
+    """
+    return len(sizes)
+
+
+def other(path=object()):
+    pass
+'''
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'tool.py'
+    path.write_text(SOURCE)
+    return str(path)
+
+
+def test_dry_run_without_import(source, capsys):
+    assert main.cli(['--dry-run', source, 'x', '1', '2', '-v']) == 0
+    assert capsys.readouterr().out == (
+        "args: ['x', 1, 2]\n"
+        "kwargs: {'verbose': True, 'mode': 'fast'}\n")
+
+    assert main.cli(['--dry-run', source, 'x', '--mode']) == 2
+    assert 'expects a value' in capsys.readouterr().err
+
+    # the spec of other can't be determined statically
+    with pytest.raises(ImportError):
+        main.cli(['--dry-run', '--func=other', source])
+    with pytest.raises(ImportError):
+        main.cli(['--func', 'other', '--dry-run', source])
+
+
+def test_run(tmp_path, capsys):
+    path = tmp_path / 'tool.py'
+    path.write_text(SOURCE.replace('import module_which_does_not_exist', ''))
+
+    assert main.cli([str(path), 'x', '1', '2', '3']) == 3
+    assert main.cli([str(path), 'x', '--unknown']) == 2
+    assert main.cli(['--func', 'main', str(path), 'x', '1']) == 1
+
+    assert main.cli(['--help']) == 0
+    assert '--func' in capsys.readouterr().out
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+import classarg.core as core
+import classarg.validation as validation
+
+
+def _make_func():
+    @validation.at_least('b', 'c')
+    def func(a: int, *, b=False, c=False):
+        """Lorem ipsum dolor sit amet.
+
+        a:  Lorem ipsum dolor sit amet.
+        """
+        return a
+
+    return func
+
+
+def test_profile_phases():
+    func = _make_func()
+    originals = (core._run, core.match, core.Matcher.match,
+                 core._compile_rule, core._get_validator)
+
+    with core.profile() as prof:
+        assert core.run(func, args=['1', '-b']) == 1
+        with pytest.raises(ValueError):
+            core.run(func, args=['1'])
+
+    # everything is restored
+    assert (core._run, core.match, core.Matcher.match,
+            core._compile_rule, core._get_validator) == originals
+
+    summary = prof.summary()
+    for phase in ('getfullargspec', 'load_type_hints', 'load_doc_hints',
+                  'parse', 'compile_matcher', 'match', 'match_args'):
+        assert summary[phase]['count'] >= 1, phase
+    assert summary['run']['count'] == 2
+    assert summary['validate']['count'] == 2
+    assert summary['rule:at_least']['count'] == 2
+
+    # nested phases start later and end earlier than the outer ones
+    parse = next(r for r in prof.records if r.name == 'parse')
+    hints = next(r for r in prof.records if r.name == 'load_doc_hints')
+    assert hints.depth > parse.depth
+    assert parse.start_ns <= hints.start_ns
+    assert (hints.start_ns + hints.duration_ns <=
+            parse.start_ns + parse.duration_ns)
+
+
+def test_profile_single_active():
+    with core.profile():
+        with pytest.raises(RuntimeError):
+            with core.profile():
+                pass
+
+    with core.profile():
+        pass
+
+
+def test_profile_dump(tmp_path):
+    with core.profile() as prof:
+        core.run(_make_func(), args=['1', '-c'])
+
+    prof.dump(str(tmp_path / 'profile.json'))
+    data = json.loads((tmp_path / 'profile.json').read_text())
+    assert data['summary']['run']['count'] == 1
+    assert {'name', 'start_ns', 'duration_ns', 'allocated_blocks'}.issubset(
+        data['records'][0])
+
+    prof.dump(str(tmp_path / 'trace.json'), format='chrome')
+    data = json.loads((tmp_path / 'trace.json').read_text())
+    assert all(event['ph'] == 'X' for event in data['traceEvents'])
+    assert 'run' in [event['name'] for event in data['traceEvents']]
+
+    with pytest.raises(ValueError):
+        prof.dump(str(tmp_path / 'x'), format='xml')
+
+
+def test_profile_env(tmp_path, monkeypatch):
+    path = tmp_path / 'trace.json'
+    monkeypatch.setenv('CLASSARG_PROFILE', str(path))
+    monkeypatch.setenv('CLASSARG_PROFILE_FORMAT', 'chrome')
+
+    assert core.run(_make_func(), args=['2', '-b']) == 2
+    data = json.loads(path.read_text())
+    assert 'run' in [event['name'] for event in data['traceEvents']]
@@ -0,0 +1,122 @@
+import os
+import sys
+import shutil
+import socket
+import tempfile
+import threading
+
+import pytest
+
+import classarg.client as client
+from classarg.server import Server, run_command
+from classarg.dispatch import Dispatcher
+
+
+@pytest.fixture
+def commands(tmp_path, monkeypatch):
+    root = tmp_path / 'server_pkg'
+    root.mkdir()
+    (root / '__init__.py').write_text('')
+    (root / 'tool.py').write_text(
+        'import os\n'
+        'import sys\n\n'
+        'def build(target, *, jobs: int = 1):\n'
+        '    print(target, jobs)\n'
+        '    return jobs\n\n'
+        'def pwd():\n'
+        '    print(os.getcwd())\n\n'
+        'def fail():\n'
+        '    raise RuntimeError("boom")\n\n'
+        'def leave():\n'
+        '    sys.exit(3)\n')
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield {name: 'server_pkg.tool:' + name
+           for name in ('build', 'pwd', 'fail', 'leave')}
+
+    for name in list(sys.modules):
+        if name.startswith('server_pkg'):
+            del sys.modules[name]
+
+
+@pytest.fixture
+def server(commands):
+    # Unix socket paths are limited to about 100 characters.
+    directory = tempfile.mkdtemp()
+    server = Server(os.path.join(directory, 'tool.sock'), commands)
+    thread = threading.Thread(target=server.serve_forever,
+                              kwargs=dict(poll_interval=0.05))
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    thread.join()
+    server.server_close()
+    assert not os.path.exists(server.path)
+    shutil.rmtree(directory)
+
+
+def test_run_command(commands):
+    dispatcher = Dispatcher(commands)
+
+    assert run_command(dispatcher, ['build', 'x', '--jobs=2']) == (
+        2, 'x 2\n', '')
+
+    status, stdout, stderr = run_command(dispatcher, ['build'])
+    assert status == 2 and stderr.startswith('error: ')
+
+    status, stdout, stderr = run_command(dispatcher, ['fail'])
+    assert status == 1 and 'RuntimeError: boom' in stderr
+
+    assert run_command(dispatcher, ['leave'])[0] == 3
+
+
+def test_server_preloads(server):
+    assert 'server_pkg.tool' in sys.modules
+    assert set(server.dispatcher._loaded) == {'build', 'pwd', 'fail', 'leave'}
+
+
+def test_client_call(server, tmp_path):
+    response = client.call(server.path, ['build', 'x'])
+    assert response == dict(status=1, stdout='x 1\n', stderr='')
+
+    response = client.call(server.path, ['pwd'], cwd=str(tmp_path))
+    assert response['stdout'] == str(tmp_path) + '\n'
+    assert os.getcwd() != str(tmp_path)
+
+    response = client.call(server.path, ['missing'])
+    assert response['status'] == 2
+
+
+def test_client_main(server, capsys):
+    assert client.main([server.path, 'build', 'y', '--jobs=4']) == 4
+    assert capsys.readouterr().out == 'y 4\n'
+
+    assert client.main([]) == 2
+    assert client.main([server.path + '.missing', 'build']) == 2
+
+
+def test_server_socket_path(server, commands):
+    assert os.stat(server.path).st_mode & 0o777 == 0o600
+
+    # a running server is not replaced
+    with pytest.raises(FileExistsError):
+        Server(server.path, commands)
+    assert client.call(server.path, ['build', 'x'])['status'] == 1
+
+    directory = os.path.dirname(server.path)
+    path = os.path.join(directory, 'other')
+    with open(path, 'w') as f:
+        f.write('data')
+    with pytest.raises(FileExistsError):
+        Server(path, commands)
+    assert os.path.isfile(path)
+
+    # a stale socket is replaced
+    path = os.path.join(directory, 'stale.sock')
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(path)
+    other = Server(path, commands)
+    other.server_close()
+    assert not os.path.exists(path)
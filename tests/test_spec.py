@@ -0,0 +1,104 @@
+import pickle
+from types import SimpleNamespace
+
+import pytest
+
+import classarg.core as core
+from classarg._spec import Spec
+
+
+def _gen_spec():
+    def func(a, b=1, *c, d: int, e_f=2, **g):
+        """Lorem ipsum dolor sit amet.
+
+        a:  Lorem ipsum dolor sit amet.
+        -x: --e_f
+        -y: --h
+        """
+
+    return core.parse(func, cache=False)
+
+
+def test_spec_fields():
+    spec = _gen_spec()
+
+    assert isinstance(spec, Spec)
+    assert spec.args == ('a', 'b') and spec.kwonlyargs == ('d', 'e_f')
+    assert spec.varargs == 'c' and spec.varkw == 'g'
+    assert spec.defaults == (1, ) and spec.kwonlydefaults == dict(e_f=2)
+    assert spec.argument_docs == dict(a='Lorem ipsum dolor sit amet.')
+    assert spec.aliases == dict(x='e_f', y='h')
+    assert not hasattr(spec, '__dict__')
+
+    # fields from docstrings are only set if there's one
+    assert not hasattr(core.parse(lambda a: a), 'descriptions')
+
+
+def test_spec_lookup_tables():
+    spec = _gen_spec()
+
+    assert spec.positions == dict(a=0, b=1)
+    assert spec.default_map == dict(b=1, e_f=2)
+    assert spec.canonical_names == {
+        'a': 'a', 'b': 'b', 'd': 'd', 'e_f': 'e_f', 'e-f': 'e_f',
+        'x': 'e_f', 'y': 'h'}
+
+
+def test_spec_interned_names():
+    import sys
+
+    name = ''.join(['long', '_name'])
+    assert Spec(args=[name]).args[0] is sys.intern('long_name')
+
+
+def test_spec_immutable():
+    spec = _gen_spec()
+
+    with pytest.raises(AttributeError):
+        spec.args = ('x', )
+    with pytest.raises(AttributeError):
+        spec.extra = 1
+    with pytest.raises(AttributeError):
+        del spec.varargs
+
+    new_spec = spec.replace(args=['x'])
+    assert new_spec.args == ('x', ) and new_spec.positions == dict(x=0)
+    assert new_spec.kwonlyargs == spec.kwonlyargs
+    assert spec.args == ('a', 'b')
+
+    with pytest.raises(TypeError):
+        Spec(unknown=1)
+
+
+def test_spec_eq():
+    spec = _gen_spec()
+
+    assert spec == Spec.from_namespace(SimpleNamespace(**spec.asdict()))
+    assert spec != spec.replace(varkw=None)
+    assert spec != spec.asdict()
+
+    # lists and tuples are equal, like the specs of older versions
+    namespace = SimpleNamespace(
+        args=['a'], varargs=None, varkw=None, defaults=(),
+        kwonlyargs=(), kwonlydefaults={}, annotations={})
+    assert Spec(args=('a', )) == namespace
+    assert namespace == Spec(args=('a', ))
+
+
+def test_spec_pickle():
+    spec = _gen_spec()
+    loaded = pickle.loads(pickle.dumps(spec))
+
+    assert loaded == spec
+    assert loaded.canonical_names == spec.canonical_names
+
+
+def test_spec_namespace_matcher():
+    namespace = SimpleNamespace(
+        args=['a'], varargs=None, varkw=None, defaults=(),
+        kwonlyargs=['b'], kwonlydefaults=dict(b=False), annotations={},
+        aliases=dict(c='b'))
+
+    matcher = core.compile_matcher(namespace)
+    assert isinstance(matcher.spec, Spec)
+    assert matcher.match(['x', '-c']) == (['x'], dict(b=True))
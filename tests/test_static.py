@@ -0,0 +1,124 @@
+import ast
+
+import pytest
+
+import classarg.core as core
+import classarg._static as static
+from classarg.utils import load_module, get_qualified_attr
+
+
+SOURCE = '''
+import functools
+import typing
+import typing as t
+from typing import List, Optional
+from typing import List as L
+
+
+def func(a, b: int = 1, *c: 'float', d: Optional[int], e=(1, 2), **f):
+    """Lorem ipsum dolor sit amet.
+
+    a:  Lorem ipsum dolor sit amet.
+    g:  a flag of kwargs.
+    -x: --g
+    """
+
+
+async def async_func(a, *, b: List[int] = None) -> int:
+    pass
+
+
+class X:
+    """Lorem ipsum dolor sit amet.
+
+    a:  Lorem ipsum dolor sit amet.
+    """
+    def __init__(self, a, b=1, *c, d: int, e=2, **f): pass
+
+    def func(self, a, b=1, *c, d: int, e=2, **f): pass
+
+    @classmethod
+    def func2(cls, a, b=1, *c, d: int, e=2, **f): pass
+
+    @staticmethod
+    def func3(a, b=1, *c, d: int, e=2, **f): pass
+
+
+class Y:
+    pass
+
+
+class Z(X):
+    pass
+
+
+@functools.lru_cache()
+def decorated(a): pass
+
+
+def not_literal(a=object()): pass
+
+
+def qualified(a: typing.List[int], b: typing.Optional[str] = None): pass
+
+
+def aliased(a: L[int], b: t.Set[str]): pass
+
+
+def unknown(a: functools.partial): pass
+
+
+def rebound(a, b=1): pass
+
+
+rebound = functools.partial(rebound, 0)
+'''
+
+
+@pytest.fixture(scope='module')
+def source(tmp_path_factory):
+    path = tmp_path_factory.mktemp('static') / 'target.py'
+    path.write_text(SOURCE)
+    return str(path), load_module(str(path))
+
+
+@pytest.mark.parametrize('qualname', [
+    'func', 'async_func', 'X', 'X.func', 'X.func2', 'X.func3', 'Y',
+    'qualified'])
+def test_extract_spec(source, qualname):
+    path, module = source
+    expect = core.parse(get_qualified_attr(module, qualname), cache=False)
+
+    assert static.extract_spec(path, qualname) == expect
+
+
+@pytest.mark.parametrize('qualname', [
+    'Z', 'decorated', 'not_literal', 'missing', 'X.missing', 'func.a',
+    'rebound'])
+def test_extract_spec_not_static(source, qualname):
+    assert static.extract_spec(source[0], qualname) is None
+
+
+@pytest.mark.parametrize('qualname, is_static', [
+    ('qualified', True), ('aliased', False), ('unknown', False)])
+def test_extract_spec_annotations(source, qualname, is_static):
+    # Annotations which can't be resolved statically fall back to parse.
+    path, module = source
+    expect = core.parse(get_qualified_attr(module, qualname), cache=False)
+
+    assert static.extract_spec(path, qualname) == (
+        expect if is_static else None)
+
+
+def test_extract_spec_skip_type_hints(source):
+    spec = static.extract_spec(source[0], 'func', skip_type_hints=True)
+    assert spec.annotations == dict(g=bool)
+
+
+@pytest.mark.parametrize('annotation', [
+    'int', 'List[int]', 'typing.Optional[typing.Tuple[int, str]]',
+    "Union[int, None, 'float']"])
+def test_format_annotation(annotation):
+    names = {'int', 'str', 'List', 'Union', 'typing'}
+    node = ast.parse(annotation, mode='eval').body
+    assert static._format_annotation(node, names) == annotation
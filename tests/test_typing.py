@@ -1,7 +1,10 @@
 import pytest
+
+import classarg._typing as _typing
 from classarg._typing import (
     Union, Optional, List, Set, Tuple,
-    normalize_type, infer_default_type,
+    normalize_type, infer_default_type, compile_converter,
+    type_cache_info, clear_type_cache,
 )
 
 
@@ -96,3 +99,71 @@ def _gen_default_testcase():
 @pytest.mark.parametrize('default, expect', list(_gen_default_testcase()))
 def test_infer_default_type(default, expect):
     assert infer_default_type(default) == expect
+
+
+def _gen_converter_testcase():
+    yield int, '3', 3
+    yield bool, 'yes', True
+    yield bool, 'Off', False
+    yield bool, 'x', ValueError()
+    yield Optional[int], '3', 3
+    yield Optional[int], '', None
+    yield Optional[str], '', ''
+    yield Union[int, float, str], '2.5', 2.5
+    yield Union[int, float], 'x', ValueError()
+    yield Union[int, str], '1', 1
+    yield Union[str, int], '1', '1'
+    yield List[int], '1,2,3', [1, 2, 3]
+    yield List[int], '', []
+    yield Set[str], 'a,b,a', {'a', 'b'}
+    yield Tuple[int, float], '1,2.5', (1, 2.5)
+    yield Tuple[int, float], '1', ValueError()
+    yield List[Tuple[int, int]], '1,2', TypeError()
+
+
+@pytest.mark.parametrize('type_, value, expect',
+                         list(_gen_converter_testcase()))
+def test_compile_converter(type_, value, expect):
+    if isinstance(expect, Exception):
+        with pytest.raises(Exception) as e_info:
+            ret = compile_converter(normalize_type(type_))(value)
+            print(ret)  # only print if not raising error
+
+        assert isinstance(expect, e_info.type)
+
+    else:
+        converter = compile_converter(normalize_type(type_))
+        assert converter(value) == expect
+        assert compile_converter(normalize_type(type_)) is converter
+
+
+def test_type_cache(monkeypatch):
+    clear_type_cache()
+
+    first = normalize_type('Optional[List[int]]')
+    assert normalize_type('Optional[List[int]]') is first
+    info = type_cache_info()
+    assert info['normalize_type'].hits >= 1
+    assert info['compile'].misses == 1
+
+    # equal strings built at runtime are different objects, but they're
+    # not normalized again
+    annotation = ''.join(['Optional[', 'List[int]]'])
+    with monkeypatch.context() as m:
+        m.setattr(_typing, '_normalize_type', None)
+        assert normalize_type(annotation) is first
+
+    for _ in range(2):
+        with pytest.raises(TypeError):
+            normalize_type('Unknown[int]')
+    assert type_cache_info()['compile'].currsize == 2
+
+    # Union members in different orders are different annotations
+    assert normalize_type(Union[int, str]).__args__ == (int, str)
+    assert normalize_type(Union[str, int]).__args__ == (str, int)
+    assert compile_converter(normalize_type(Union[str, int]))('1') == '1'
+    assert compile_converter(normalize_type(Union[int, str]))('1') == 1
+
+    assert infer_default_type((1, 2)) is infer_default_type((3, 4))
+    assert infer_default_type((1, 2)) != infer_default_type((True, 2))
+    assert type_cache_info()['infer_default_type'].hits >= 1
@@ -0,0 +1,158 @@
+import pytest
+
+import classarg.core as core
+import classarg.validation as validation
+
+
+def test_rules_in_run():
+    @validation.at_least('a', 'b')
+    def func(*, a=False, b=False):
+        return a, b
+
+    assert core.run(func, args=['-a']) == (True, False)
+    with pytest.raises(ValueError):
+        core.run(func, args=[])
+
+
+def test_validator_compiled_once(monkeypatch):
+    compiled = []
+
+    def rule(name, *, spec, matcher):
+        if matcher[name] < 0:
+            raise ValueError(name)
+
+    def compile_rule(name, *, spec):
+        compiled.append(name)
+        return lambda matcher: rule(name, spec=spec, matcher=matcher)
+
+    rule.compile = compile_rule
+    validation.register('positive', rule)
+
+    try:
+        @validation.positive('a')
+        def func(a: int, *b: int):
+            return a
+
+        for i in range(3):
+            assert core.run(func, args=[str(i)]) == i
+        assert compiled == ['a']
+
+        with pytest.raises(ValueError):
+            core.run(func, args=['-1'])
+
+        # rules attached later are picked up; b is a tuple of varargs
+        validation.positive('b')(func)
+        with pytest.raises(TypeError):
+            core.run(func, args=['1', '2'])
+        assert compiled == ['a', 'a', 'b']
+    finally:
+        validation.unregister('positive')
+
+
+def test_rules_without_compile():
+    def rule(*, spec, matcher):
+        if matcher['c'] != ('x', ):
+            raise ValueError
+
+    validation.register('only_x', rule)
+    try:
+        func = validation.only_x()(lambda *c: c)
+        assert core.run(func, args=['x']) == ('x', )
+        with pytest.raises(ValueError):
+            core.run(func, args=['y'])
+    finally:
+        validation.unregister('only_x')
+
+
+def test_match_many_validates_in_batches(monkeypatch):
+    monkeypatch.setattr(core, '_batch_size', 2)
+
+    @validation.one_of('a', 'b')
+    def func(*, a=False, b=False, c: int = 0):
+        return a, b
+
+    argvs = [['-a'], ['-a', '-b'], ['--c=x'], ['-b'], []]
+    results = list(core.match_many(func, argvs, collect_errors=True))
+    assert results[0] == ([], dict(a=True, b=False, c=0))
+    assert isinstance(results[1], ValueError)
+    assert isinstance(results[2], core.ArgumentError)
+    assert results[3] == ([], dict(a=False, b=True, c=0))
+    assert isinstance(results[4], ValueError)
+
+    with pytest.raises(ValueError):
+        list(core.match_many(func, argvs))
+    assert len(list(core.match_many(func, argvs[:2], check=False))) == 2
+
+
+def test_validate_many():
+    def rule(*, spec, matcher):
+        if matcher['a'] < 0:
+            raise ValueError
+
+    validation.register('positive_a', rule)
+    try:
+        @validation.positive_a()
+        @validation.enforce_type('error')
+        def func(a: int): pass
+
+        errors = core.validate_many(func, [dict(a=1), dict(a='x'), dict(a=-1)])
+        assert errors[0] is None
+        assert isinstance(errors[1], TypeError)
+        assert isinstance(errors[2], ValueError)
+    finally:
+        validation.unregister('positive_a')
+
+
+def test_concurrent_register_and_validate():
+    from threading import Thread, Barrier
+
+    def rule(name, *, spec, matcher):
+        if matcher['a'] < 0:
+            raise ValueError(name)
+
+    validation.register('nonnegative', rule)
+
+    @validation.nonnegative('a')
+    @validation.at_least('b')
+    def func(a: int, *, b=False):
+        return a
+
+    validation.unregister('nonnegative')
+    n_threads, n_rounds = 8, 200
+    barrier = Barrier(n_threads * 2)
+    errors = []
+
+    def writer(k):
+        barrier.wait()
+        try:
+            for i in range(n_rounds):
+                name = 'rule_{}_{}'.format(k, i)
+                validation.register(name, rule)
+                getattr(validation, name)(name)(func)
+                validation.unregister(name)
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        barrier.wait()
+        try:
+            for i in range(n_rounds):
+                rules = func._classarg_val
+                assert isinstance(rules, tuple)
+                assert core.run(func, args=[str(i), '-b']) == i
+                with pytest.raises(ValueError):
+                    core.run(func, args=['-1', '-b'])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [Thread(target=writer, args=(k, )) for k in range(n_threads)]
+    threads += [Thread(target=reader) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    # no registration is lost, and every rule is attached exactly once
+    assert len(func._classarg_val) == 2 + n_threads * n_rounds
+    assert not any(name.startswith('rule_') for name in validation._rules)
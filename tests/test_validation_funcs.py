@@ -37,3 +37,122 @@ def test_parse(flags, spec, matcher, expect):
 
     else:
         assert v_funcs.at_least(*flags, spec=spec, matcher=matcher) == expect
+
+
+def _gen_one_of_testcase():
+    def func(a, b=True, c=False, d=3, *e, f: bool, g: str): pass
+    spec = core.parse(func)
+
+    matcher = dict(a=True, b=True, c=False, d=3, f=False, g='g')
+
+    # 0. exactly one flag is set
+    yield ('a', 'c'), spec, matcher, None
+
+    # 1. more than one flag is set
+    yield ('a', 'b'), spec, matcher, ValueError()
+
+    # 2. no flag is set
+    yield ('c', 'f'), spec, matcher, ValueError()
+
+    # 3. when flags not found in spec
+    yield ('a', 'z'), spec, matcher, KeyError()
+
+    # 4. when flag annotation not the right type
+    yield ('c', 'g'), spec, matcher, TypeError()
+
+
+@pytest.mark.parametrize('flags, spec, matcher, expect',
+                         list(_gen_one_of_testcase()))
+def test_one_of(flags, spec, matcher, expect):
+    if isinstance(expect, Exception):
+        with pytest.raises(type(expect)):
+            v_funcs.one_of(*flags, spec=spec, matcher=matcher)
+    else:
+        assert v_funcs.one_of(*flags, spec=spec, matcher=matcher) is None
+
+
+def _gen_enforce_type_testcase():
+    from typing import List, Optional
+
+    def func(a: int, b: Optional[float] = None, *c: int,
+             d: List[str] = None, **e): pass
+    spec = core.parse(func)
+
+    # 0. values of the right types
+    yield 'error', spec, dict(a=1, b=None, c=(1, 2), d=['x']), None
+
+    # 1. ints are floats
+    yield 'error', spec, dict(a=1, b=2), None
+
+    # 2. bools are not ints
+    yield 'error', spec, dict(a=True), TypeError()
+
+    # 3. each vararg is checked
+    yield 'error', spec, dict(a=1, c=(1, 'x')), TypeError()
+
+    # 4. items of lists are checked
+    yield 'error', spec, dict(a=1, d=[1]), TypeError()
+
+    # 5. strings are accepted in 'str' mode
+    yield 'str', spec, dict(a='1', c=(1, 'x')), None
+
+    # 6. unknown mode
+    yield 'none', spec, dict(a=1), ValueError()
+
+
+@pytest.mark.parametrize('mode, spec, matcher, expect',
+                         list(_gen_enforce_type_testcase()))
+def test_enforce_type(mode, spec, matcher, expect):
+    if isinstance(expect, Exception):
+        with pytest.raises(type(expect)):
+            v_funcs.enforce_type(mode, spec=spec, matcher=matcher)
+    else:
+        assert v_funcs.enforce_type(mode, spec=spec, matcher=matcher) is None
+
+
+@pytest.mark.parametrize('rule, args', [
+    (v_funcs.at_least, ('a', 'b')),
+    (v_funcs.one_of, ('a', 'b')),
+    (v_funcs.enforce_type, ('error', )),
+])
+def test_batch(rule, args):
+    def func(a: bool = False, b: bool = False, c: int = 0): pass
+    spec = core.parse(func)
+
+    matchers = [dict(a=a, b=b, c=c)
+                for a in (True, False, 1) for b in (True, False)
+                for c in (0, 'x')]
+    matchers.append(dict(a=True))
+
+    # the batch form agrees with the rule row by row
+    errors = rule.compile(*args, spec=spec).batch(matchers)
+    assert len(errors) == len(matchers)
+    for matcher, error in zip(matchers, errors):
+        try:
+            rule(*args, spec=spec, matcher=matcher)
+        except Exception as e:
+            assert type(error) is type(e)
+        else:
+            assert error is None
+
+
+def test_compile_once(monkeypatch):
+    import classarg.validation as validation
+
+    calls = []
+    compile_rule = v_funcs.at_least.compile
+
+    def compile_counted(*args, **kwargs):
+        calls.append(args)
+        return compile_rule(*args, **kwargs)
+
+    monkeypatch.setattr(v_funcs.at_least, 'compile', compile_counted)
+
+    @validation.at_least('a', 'b')
+    def func(a=False, b=False): pass
+
+    matchers = [dict(a=True, b=False), dict(a=False, b=False)]
+    errors = core.validate_many(func, matchers)
+    assert errors[0] is None and isinstance(errors[1], ValueError)
+    core.validate(func, matchers[0])
+    assert calls == [('a', 'b')]